@@ -1,24 +1,32 @@
-import os
-from flask import Flask
-from flask_cors import CORS
-
-from routes.predict import predict_bp
-from routes.timeline import timeline_bp
-from routes.auth import auth_bp
-from routes.patients import patients_bp
-from routes.report import report_bp
-from routes.patient_contact import patient_contact_bp
-from routes.send_report import send_report_bp
-from routes.doctor_notes import doctor_notes_bp
-from routes.outcome import outcome_bp
-from routes.dashboard import dashboard_bp
-from routes.hospital_request import hospital_request_bp
-from routes.admin_reject import admin_reject_bp
-from routes.admin_stats import admin_stats_bp
-from routes.admin_audit import admin_audit_bp
-from routes import register_routes
-
-from config import DEBUG
+import importlib
+import logging
+
+from utils import startup_profile
+
+with startup_profile.step("import flask"):
+    from flask import Flask, jsonify
+    from flask_cors import CORS
+
+from config import DEBUG, STARTUP_PROFILE
+
+# (module, blueprint) — imported inside create_app so boot time is
+# attributed per module in the startup report
+BLUEPRINTS = [
+    ("routes.auth", "auth_bp"),
+    ("routes.predict", "predict_bp"),
+    ("routes.timeline", "timeline_bp"),
+    ("routes.patients", "patients_bp"),
+    ("routes.doctor_notes", "doctor_notes_bp"),
+    ("routes.report", "report_bp"),
+    ("routes.patient_contact", "patient_contact_bp"),
+    ("routes.send_report", "send_report_bp"),
+    ("routes.outcome", "outcome_bp"),
+    ("routes.dashboard", "dashboard_bp"),
+    ("routes.hospital_request", "hospital_request_bp"),
+    ("routes.admin_reject", "admin_reject_bp"),
+    ("routes.admin_stats", "admin_stats_bp"),
+    ("routes.admin_audit", "admin_audit_bp"),
+]
 
 
 def create_app():
@@ -32,23 +40,45 @@ def create_app():
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
     )
 
+    with startup_profile.step("init firebase"):
+        import firebase  # noqa: F401
+
+    # 🔐 Bearer token verified once per request (cached), claims on flask.g
+    from utils.auth import load_request_auth
+    app.before_request(load_request_auth)
+
     # 🔗 Blueprints
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(predict_bp)
-    app.register_blueprint(timeline_bp)
-    app.register_blueprint(patients_bp)
-    app.register_blueprint(doctor_notes_bp)
-    app.register_blueprint(report_bp)
-    app.register_blueprint(patient_contact_bp)
-    app.register_blueprint(send_report_bp)
-    app.register_blueprint(outcome_bp)
-    app.register_blueprint(dashboard_bp)
-    app.register_blueprint(hospital_request_bp)
-    app.register_blueprint(admin_reject_bp)
-    app.register_blueprint(admin_stats_bp)
-    app.register_blueprint(admin_audit_bp)
-
-    register_routes(app)
+    for module_name, blueprint_name in BLUEPRINTS:
+        with startup_profile.step(f"import {module_name}"):
+            module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, blueprint_name))
+
+    with startup_profile.step("import routes (admin)"):
+        from routes import register_routes
+        register_routes(app)
+
+    # 🧠 Model: load once per worker, then follow registry activations
+    with startup_profile.step("load model"):
+        from ml.predictor import current_model, start_model_refresh
+        current_model()
+        start_model_refresh()
+
+    # ⏱ Opt-in only (STARTUP_PROFILE=1), never implied by DEBUG
+    if STARTUP_PROFILE:
+        app.logger.setLevel(logging.INFO)
+        startup_profile.log_report(app.logger)
+
+        @app.route("/debug/startup", methods=["GET"])
+        def startup_report():
+            from utils.auth import verify_admin
+
+            try:
+                verify_admin()
+            except Exception as e:
+                return jsonify({"error": str(e)}), 401
+
+            return jsonify(startup_profile.report())
+
     return app
 
 
@@ -58,4 +88,4 @@ if __name__ == "__main__":
         host="127.0.0.1",
         port=5000,
         debug=DEBUG
-    )
\ No newline at end of file
+    )
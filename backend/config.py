@@ -5,4 +5,34 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
 SCALER_PATH = os.path.join(BASE_DIR, "models", "scaler.pkl")
 
+# Memory-mapped forest + scaler exported by ml/train_model.py
+MODEL_ARTIFACT_PATH = os.path.join(BASE_DIR, "models", "model.vpf")
+
+# Versioned model registry: "" (local files above), "bucket" or "local:/path"
+MODEL_REGISTRY = os.getenv("MODEL_REGISTRY", "")
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "/tmp/vitapulse-models")
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "60"))
+
+# Micro-batching of concurrent /predict calls (INFERENCE_BATCHING=0 bypasses it)
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "1") != "0"
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "2"))
+INFERENCE_BATCH_MAX_ROWS = int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "64"))
+
+# Hard wall-clock budget per counterfactual search (utils/counterfactual.py)
+COUNTERFACTUAL_BUDGET_MS = float(os.getenv("COUNTERFACTUAL_BUDGET_MS", "250"))
+
+# Threads computing deferred /predict explanations
+EXPLANATION_WORKERS = int(os.getenv("EXPLANATION_WORKERS", "2"))
+
+# Concurrent per-patient save transactions in /predict/batch
+BATCH_SAVE_WORKERS = int(os.getenv("BATCH_SAVE_WORKERS", "8"))
+
+# How often each worker re-reads a user's revocation / disabled state
+# (one Firebase Auth get_user per uid); also the longest a revoked
+# session keeps working
+TOKEN_REVOCATION_CHECK_SECONDS = float(os.getenv("TOKEN_REVOCATION_CHECK_SECONDS", "60"))
+
+# Startup timing report in the log and at /debug/startup (admins only)
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE") == "1"
+
 DEBUG = True
\ No newline at end of file
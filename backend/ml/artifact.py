@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from ml.forest import FlatForest
+
+
+# ===============================
+# FILE LAYOUT
+# ===============================
+# [ MAGIC (8) | header_len u32 | header_crc32 u32 | header JSON | pad ]
+# [ array 0 | pad | array 1 | pad | ... ]     (uncompressed, 64-byte aligned)
+#
+# The header lists dtype / shape / offset of every array plus a sha256
+# of the payload. Arrays are read through one read-only numpy.memmap,
+# so every worker process shares the same page-cache pages.
+MAGIC = b"VPFOREST"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct("<8sII")
+
+FOREST_ARRAYS = ["feature", "threshold", "left", "right", "value", "roots", "classes"]
+SCALER_ARRAYS = ["scaler_mean", "scaler_scale"]
+
+
+class ArtifactError(Exception):
+    pass
+
+
+class FlatScaler:
+    """
+    StandardScaler.transform() from two arrays (same float64 ops, same bits).
+    """
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+def _aligned(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_artifact(path, forest, scaler, model_version=None):
+    """
+    Export a FlatForest + fitted scaler to a single memory-mappable file.
+    """
+    if not isinstance(forest, FlatForest):
+        forest = FlatForest.from_sklearn(forest)
+    if not isinstance(scaler, FlatScaler):
+        scaler = FlatScaler.from_sklearn(scaler)
+
+    arrays = {
+        "feature": forest.feature.astype("<i8"),
+        "threshold": forest.threshold.astype("<f8"),
+        "left": forest.left.astype("<i8"),
+        "right": forest.right.astype("<i8"),
+        "value": forest.value.astype("<f8"),
+        "roots": forest.roots.astype("<i8"),
+        "classes": forest.classes_.astype("<i8"),
+        "scaler_mean": scaler.mean_.astype("<f8"),
+        "scaler_scale": scaler.scale_.astype("<f8"),
+    }
+
+    layout = {}
+    offset = 0
+    payload_hash = hashlib.sha256()
+
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        layout[name] = {
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "offset": offset,
+            "nbytes": arr.nbytes,
+        }
+        payload_hash.update(arr.tobytes())
+        offset = _aligned(offset + arr.nbytes)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version or time.strftime("%Y%m%d%H%M%S"),
+        "created_at": time.time(),
+        "max_depth": forest.max_depth,
+        "arrays": layout,
+        "payload_sha256": payload_hash.hexdigest(),
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    data_start = _aligned(PREAMBLE.size + len(header_bytes))
+
+    # Write next to the target and rename, so readers never see half a file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header_bytes), zlib.crc32(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - f.tell()))
+
+        for name, arr in arrays.items():
+            f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+            f.write(arr.tobytes())
+
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    """
+    Parse and check the artifact header without touching the payload.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) != PREAMBLE.size:
+            raise ArtifactError("Artifact truncated")
+
+        magic, header_len, header_crc = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ArtifactError("Not a model artifact")
+
+        header_bytes = f.read(header_len)
+
+    if len(header_bytes) != header_len or zlib.crc32(header_bytes) != header_crc:
+        raise ArtifactError("Artifact header checksum mismatch")
+
+    header = json.loads(header_bytes.decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact version: {header.get('format_version')}")
+
+    header["data_start"] = _aligned(PREAMBLE.size + header_len)
+    return header
+
+
+def open_artifact(path, verify_payload=False):
+    """
+    Map an artifact read-only.
+
+    Returns:
+        FlatForest, FlatScaler, dict header
+    """
+    header = read_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    arrays = {}
+    payload_hash = hashlib.sha256()
+
+    for name in FOREST_ARRAYS + SCALER_ARRAYS:
+        spec = header["arrays"].get(name)
+        if spec is None:
+            raise ArtifactError(f"Artifact missing array: {name}")
+
+        start = header["data_start"] + spec["offset"]
+        end = start + spec["nbytes"]
+        if end > buffer.size:
+            raise ArtifactError("Artifact truncated")
+
+        arrays[name] = buffer[start:end].view(np.dtype(spec["dtype"])).reshape(spec["shape"])
+
+        if verify_payload:
+            payload_hash.update(arrays[name].tobytes())
+
+    if verify_payload and payload_hash.hexdigest() != header["payload_sha256"]:
+        raise ArtifactError("Artifact payload checksum mismatch")
+
+    forest = FlatForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=header["max_depth"],
+        classes=np.array(arrays["classes"]),
+    )
+    scaler = FlatScaler(arrays["scaler_mean"], arrays["scaler_scale"])
+
+    return forest, scaler, header
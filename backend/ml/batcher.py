@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent predict_proba() calls into one model call.
+
+    Request threads put their (already scaled) rows on a queue and wait
+    on a Future. A single worker thread takes the first waiting request,
+    keeps collecting until `window_ms` has passed or `max_batch` rows are
+    queued, then scores everything as one matrix and hands each caller
+    its own slice back.
+
+    Exposes predict_proba(), so it can stand in for the model anywhere
+    (e.g. what_if_analysis). bind(model) scores against a specific model
+    snapshot instead of the default one; rows bound to different models
+    are never mixed in one call. With enabled=False every call goes
+    straight to the model.
+    """
+
+    def __init__(self, predict_proba=None, window_ms=2.0, max_batch=64, enabled=True):
+        self._predict_proba = predict_proba
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.enabled = enabled
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+    def predict_proba(self, X, predict_proba=None):
+        predict_proba = predict_proba or self._predict_proba
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        if not self.enabled:
+            return predict_proba(X)
+
+        self._ensure_worker()
+
+        future = Future()
+        self._queue.put((X, future, predict_proba))
+        return future.result()
+
+    def bind(self, model):
+        return _BoundModel(self, model)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "queue_depth": self.queue_depth(),
+            "batches": self.batches,
+            "rows": self.rows,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.rows / self.batches, 2) if self.batches else None,
+        }
+
+    # -------------------------
+    # WORKER
+    # -------------------------
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+
+        with self._start_lock:
+            if self._worker is None:
+                worker = threading.Thread(
+                    target=self._run,
+                    name="inference-batcher",
+                    daemon=True
+                )
+                worker.start()
+                self._worker = worker
+
+    def _collect(self):
+        first = self._queue.get()
+        pending = [first]
+        n_rows = first[0].shape[0]
+        deadline = time.monotonic() + self.window
+
+        while n_rows < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            n_rows += item[0].shape[0]
+
+        return pending, n_rows
+
+    def _run(self):
+        while True:
+            pending, n_rows = self._collect()
+
+            # One model call per distinct model (only differs across a hot swap)
+            groups = {}
+            for item in pending:
+                groups.setdefault(item[2], []).append(item)
+
+            for predict_proba, items in groups.items():
+                self._flush(predict_proba, items)
+
+            self.batches += 1
+            self.rows += n_rows
+            self.largest_batch = max(self.largest_batch, n_rows)
+
+    def _flush(self, predict_proba, items):
+        try:
+            proba = predict_proba(np.vstack([X for X, _, _ in items]))
+        except Exception as e:
+            for _, future, _ in items:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for X, future, _ in items:
+            end = start + X.shape[0]
+            future.set_result(proba[start:end])
+            start = end
+
+
+class _BoundModel:
+    """
+    predict_proba() of one model, routed through a batcher.
+    """
+
+    def __init__(self, batcher, model):
+        self._batcher = batcher
+        self._model = model
+
+    def predict_proba(self, X):
+        return self._batcher.predict_proba(X, self._model.predict_proba)
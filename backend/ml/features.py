@@ -0,0 +1,146 @@
+import numpy as np
+
+# Column order the scaler and the forest were trained on
+FEATURE_ORDER = [
+    "age_years",
+    "gender",
+    "height",
+    "weight",
+    "bmi",
+    "ap_hi",
+    "ap_lo",
+    "cholesterol",
+    "gluc",
+    "smoke",
+    "alco",
+    "active",
+    "chest_pain",
+    "nausea",
+    "palpitations",
+    "dizziness"
+]
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_ORDER)}
+
+# Input field -> feature column (numeric, copied as is)
+NUMERIC_FIELDS = {
+    "age": "age_years",
+    "gender": "gender",
+    "height": "height",
+    "weight": "weight",
+    "ap_hi": "ap_hi",
+    "ap_lo": "ap_lo",
+    "cholesterol": "cholesterol",
+    "gluc": "gluc",
+    "smoke": "smoke",
+    "alco": "alco",
+    "active": "active",
+}
+
+# Categorical lookup tables (keys are lower-cased str() of the raw value).
+# These match the encoding used when the model was trained.
+CHEST_PAIN_CODES = {
+    "none": 0,
+    "mild": 1,
+    "moderate": 2,
+    "severe": 3
+}
+
+DIZZINESS_CODES = {
+    "no": 0,
+    "mild": 1,
+    "severe": 2
+}
+
+YES_NO_CODES = {
+    "no": 0,
+    "yes": 1,
+    "0": 0,
+    "1": 1,
+    "0.0": 0,
+    "1.0": 1,
+    "false": 0,
+    "true": 1
+}
+
+CATEGORICAL_FIELDS = {
+    "chest_pain": CHEST_PAIN_CODES,
+    "nausea": YES_NO_CODES,
+    "palpitations": YES_NO_CODES,
+    "dizziness": DIZZINESS_CODES,
+}
+
+
+def _lookup(values, codes):
+    """
+    Vectorized table lookup: one dict access per *distinct* value,
+    then a single fancy-index over the column. Unknown values -> 0.
+    """
+    keys = np.char.lower(np.asarray(values, dtype=object).astype(str))
+    uniques, inverse = np.unique(keys, return_inverse=True)
+    table = np.array([codes.get(u, 0) for u in uniques], dtype=np.float32)
+    return table[inverse.reshape(-1)]
+
+
+def _fill_matrix(numeric_columns, categorical_columns):
+    n_rows = len(next(iter(numeric_columns.values())))
+    X = np.zeros((n_rows, len(FEATURE_ORDER)), dtype=np.float32)
+
+    for field, values in numeric_columns.items():
+        X[:, FEATURE_INDEX[NUMERIC_FIELDS[field]]] = np.nan_to_num(values, nan=0.0)
+
+    height_m = numeric_columns["height"] / 100
+    bmi = numeric_columns["weight"] / (height_m ** 2)
+    X[:, FEATURE_INDEX["bmi"]] = np.nan_to_num(bmi, nan=0.0)
+
+    for field, codes in CATEGORICAL_FIELDS.items():
+        X[:, FEATURE_INDEX[field]] = _lookup(categorical_columns[field], codes)
+
+    return X, bmi
+
+
+def encode_records(records):
+    """
+    Encode a list of input dicts (validated /predict inputs).
+
+    Returns:
+        np.ndarray: float32 matrix, shape (n, len(FEATURE_ORDER))
+        np.ndarray: float64 BMI per row (unrounded)
+    """
+    numeric = {
+        field: np.array([float(r[field]) for r in records], dtype=np.float64)
+        for field in NUMERIC_FIELDS
+    }
+    categorical = {
+        field: [r.get(field, 0) for r in records]
+        for field in CATEGORICAL_FIELDS
+    }
+    return _fill_matrix(numeric, categorical)
+
+
+def encode_frame(df):
+    """
+    Encode a whole DataFrame with the same raw columns as an input dict
+    (training / bulk scoring). Missing values encode as 0.
+
+    Returns:
+        np.ndarray: float32 matrix, shape (len(df), len(FEATURE_ORDER))
+    """
+    numeric = {
+        field: df[field].to_numpy(dtype=np.float64, na_value=np.nan)
+        for field in NUMERIC_FIELDS
+    }
+    categorical = {
+        field: df[field].to_numpy(dtype=object) if field in df.columns else np.zeros(len(df))
+        for field in CATEGORICAL_FIELDS
+    }
+    X, _ = _fill_matrix(numeric, categorical)
+    return X
+
+
+def encode_one(input_data: dict):
+    """
+    Single input dict -> (float32 row, BMI rounded to 2 decimals).
+    """
+    X, bmi = encode_records([input_data])
+    return X[0], round(float(bmi[0]), 2)
@@ -0,0 +1,190 @@
+import copy
+
+import numpy as np
+
+
+# Rows evaluated per traversal step (bounds the (rows x trees) index arrays)
+CHUNK_ROWS = 4096
+
+# Above this many rows sklearn's compiled traversal wins over NumPy
+# fancy indexing, so large batches go to the wrapped estimator if present.
+SMALL_BATCH_ROWS = 64
+
+
+class FlatForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous arrays.
+
+    All trees are stored back to back:
+        feature[i], threshold[i]   split of node i
+        left[i], right[i]          global child ids (leaves point to themselves)
+        value[i, c]                normalized class probability at node i
+        roots[t]                   global id of the root of tree t
+
+    predict_proba() walks every tree at once with NumPy fancy indexing,
+    so a 1-row call costs ~max_depth array ops instead of sklearn's
+    per-call validation + joblib dispatch over 300 estimators.
+    Results are bit-identical to a sequential (n_jobs=1) predict_proba.
+    Batches above SMALL_BATCH_ROWS are handed to the wrapped estimator,
+    which from_sklearn pins to n_jobs=1: large batches run on one thread
+    (no joblib fan-out over trees) so both paths give the same bits.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes,
+                 estimator=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_estimators = len(roots)
+        self.n_classes_ = len(classes)
+        self.estimator = estimator
+
+    @classmethod
+    def from_sklearn(cls, model):
+        # Sequential tree order keeps the large-batch path bit-identical
+        # to the flat path (threaded accumulation order is not fixed).
+        # A shallow copy shares the fitted trees but leaves the caller's
+        # estimator untouched.
+        model = copy.copy(model)
+        model.set_params(n_jobs=1)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.intp)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+            estimator=model,
+        )
+
+    def apply(self, X):
+        """
+        Leaf ids, shape (n_rows, n_estimators).
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+
+        node = np.tile(self.roots, n_rows)
+        row = np.repeat(np.arange(n_rows, dtype=np.intp), self.n_estimators)
+
+        # Only (row, tree) pairs that have not reached a leaf keep walking
+        active = np.arange(node.size, dtype=np.intp)
+
+        while active.size:
+            current = node[active]
+            go_left = X[row[active], self.feature[current]] <= self.threshold[current]
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            node[active] = nxt
+            active = active[self.left[nxt] != nxt]
+
+        return node.reshape(n_rows, self.n_estimators)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        if self.estimator is not None and X.shape[0] > SMALL_BATCH_ROWS:
+            return self.estimator.predict_proba(X)
+
+        return self.predict_proba_flat(X)
+
+    def predict_proba_flat(self, X):
+        """
+        predict_proba() that always uses the flat-array traversal.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        out = np.empty((X.shape[0], self.n_classes_), dtype=np.float64)
+
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaves = self.apply(X[start:start + CHUNK_ROWS])
+            # cumsum adds trees strictly in order, like sklearn's accumulator
+            proba = np.cumsum(self.value[leaves], axis=1)[:, -1, :]
+            proba /= self.n_estimators
+            out[start:start + CHUNK_ROWS] = proba
+
+        return out
+
+    def contributions(self, X, class_index=1):
+        """
+        Per-prediction feature contributions (decision path decomposition).
+
+        Every split a row passes through moves the tree's estimate from
+        value[parent] to value[child]; that change is credited to the
+        split feature. Averaged over trees:
+
+            predict_proba(X)[:, class_index] == bias + contributions.sum(axis=1)
+
+        Returns:
+            np.ndarray: bias, shape (n_rows,)
+            np.ndarray: contributions, shape (n_rows, n_features)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        n_rows, n_features = X.shape
+        values = self.value[:, class_index]
+        contrib = np.zeros(n_rows * n_features, dtype=np.float64)
+
+        node = np.tile(self.roots, n_rows)
+        row = np.repeat(np.arange(n_rows, dtype=np.intp), self.n_estimators)
+        active = np.arange(node.size, dtype=np.intp)
+
+        while active.size:
+            current = node[active]
+            feature = self.feature[current]
+            go_left = X[row[active], feature] <= self.threshold[current]
+            nxt = np.where(go_left, self.left[current], self.right[current])
+
+            contrib += np.bincount(
+                row[active] * n_features + feature,
+                weights=values[nxt] - values[current],
+                minlength=contrib.size
+            )
+
+            node[active] = nxt
+            active = active[self.left[nxt] != nxt]
+
+        bias = np.full(n_rows, values[self.roots].mean())
+        return bias, contrib.reshape(n_rows, n_features) / self.n_estimators
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import namedtuple
+
+from config import MODEL_ARTIFACT_PATH, MODEL_PATH, SCALER_PATH, MODEL_REGISTRY_POLL_SECONDS
+from ml.artifact import ArtifactError, FlatScaler, open_artifact
+from ml.forest import FlatForest
+from ml.registry import get_registry
+
+PICKLE_MODEL_VERSION = "pickle"
+
+# Immutable snapshot; requests take one and use it throughout
+ServingModel = namedtuple("ServingModel", ["model", "scaler", "version"])
+
+_current = None
+_load_lock = threading.Lock()
+_poller = None
+
+# Older registry versions loaded for records scored before a hot swap
+_previous = {}
+PREVIOUS_MODELS_KEPT = 2
+
+
+def load_model_and_scaler():
+    """
+    Load the serving model.
+
+    Prefers the memory-mapped artifact written by ml/train_model.py
+    (shared pages across workers, near-instant startup) and falls back
+    to the joblib pickles.
+
+    Returns:
+        model, scaler, str model_version
+    """
+    if os.path.exists(MODEL_ARTIFACT_PATH):
+        try:
+            model, scaler, header = open_artifact(MODEL_ARTIFACT_PATH)
+            return model, scaler, header["model_version"]
+        except (ArtifactError, OSError, ValueError, KeyError) as e:
+            print("MODEL ARTIFACT ERROR:", e)
+
+    # joblib / sklearn are only imported on this fallback path
+    import joblib
+
+    model = FlatForest.from_sklearn(joblib.load(MODEL_PATH))
+    scaler = FlatScaler.from_sklearn(joblib.load(SCALER_PATH))
+    return model, scaler, PICKLE_MODEL_VERSION
+
+
+def current_model():
+    """
+    The active ServingModel (registry version if configured, else local files).
+    """
+    global _current
+
+    if _current is None:
+        with _load_lock:
+            if _current is None:
+                _current = _initial_model()
+
+    return _current
+
+
+def model_for_version(version):
+    """
+    ServingModel for an exact model version: the active one, or an older
+    registry version. None when that version can no longer be loaded.
+    """
+    active = current_model()
+    if version and version == active.version:
+        return active
+
+    registry = get_registry()
+    if not version or registry is None:
+        return None
+
+    with _load_lock:
+        serving = _previous.get(version)
+        if serving is None:
+            try:
+                serving = ServingModel(*registry.load(version))
+            except (ValueError, OSError, ArtifactError) as e:
+                print("MODEL VERSION UNAVAILABLE:", version, e)
+                return None
+
+            while len(_previous) >= PREVIOUS_MODELS_KEPT:
+                _previous.pop(next(iter(_previous)))
+            _previous[version] = serving
+
+    return serving
+
+
+def _initial_model():
+    registry = get_registry()
+    if registry is not None:
+        try:
+            active = registry.active_version()
+            if active:
+                return ServingModel(*registry.load(active))
+        except Exception as e:
+            print("MODEL REGISTRY ERROR:", e)
+
+    return ServingModel(*load_model_and_scaler())
+
+
+def swap_model(serving):
+    """
+    Atomically replace the active model. In-flight requests keep the
+    snapshot they already hold, so nothing is dropped.
+    """
+    global _current
+    _current = serving
+
+
+def refresh_model():
+    """
+    Load and activate the registry's active version if it changed.
+
+    Returns:
+        bool: True if a new version was swapped in
+    """
+    registry = get_registry()
+    if registry is None:
+        return False
+
+    active = registry.active_version()
+    if not active or active == current_model().version:
+        return False
+
+    with _load_lock:
+        if active == current_model().version:
+            return False
+        swap_model(ServingModel(*registry.load(active)))
+
+    print("MODEL SWAPPED TO:", active)
+    return True
+
+
+def start_model_refresh(interval=MODEL_REGISTRY_POLL_SECONDS):
+    """
+    Poll the registry in a daemon thread (no-op without a registry).
+    """
+    global _poller
+
+    if _poller is not None or get_registry() is None or interval <= 0:
+        return
+
+    def poll():
+        stop = threading.Event()
+        while not stop.wait(interval):
+            try:
+                refresh_model()
+            except Exception as e:
+                print("MODEL REFRESH ERROR:", e)
+
+    _poller = threading.Thread(target=poll, name="model-refresh", daemon=True)
+    _poller.start()
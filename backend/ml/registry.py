@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from ml.artifact import open_artifact, read_header
+
+# Layout (bucket prefix or local directory):
+#   models/manifest.json              {"active": "<version>", "versions": {...}}
+#   models/<version>/model.vpf        forest + scaler artifact (ml/artifact.py)
+MANIFEST_NAME = "manifest.json"
+ARTIFACT_NAME = "model.vpf"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ===============================
+# STORES
+# ===============================
+class BucketModelStore:
+    """
+    Firebase Storage bucket (production).
+    """
+
+    def __init__(self, prefix="models"):
+        from firebase_admin import storage
+
+        self.bucket = storage.bucket()
+        self.prefix = prefix
+
+    def _blob(self, name):
+        return self.bucket.blob(f"{self.prefix}/{name}")
+
+    def read_text(self, name):
+        blob = self._blob(name)
+        if not blob.exists():
+            raise FileNotFoundError(f"{name} not found in Firebase Storage")
+        return blob.download_as_text()
+
+    def write_text(self, name, text):
+        self._blob(name).upload_from_string(text, content_type="application/json")
+
+    def download(self, name, dest_path):
+        self._blob(name).download_to_filename(dest_path)
+
+    def upload(self, src_path, name):
+        self._blob(name).upload_from_filename(src_path)
+
+
+class LocalDirModelStore:
+    """
+    Plain directory with the same layout as the bucket (dev / tests).
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def read_text(self, name):
+        with open(self._path(name), encoding="utf-8") as f:
+            return f.read()
+
+    def write_text(self, name, text):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(f"{path}.tmp", path)
+
+    def download(self, name, dest_path):
+        shutil.copyfile(self._path(name), dest_path)
+
+    def upload(self, src_path, name):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(src_path, path)
+
+
+# ===============================
+# REGISTRY
+# ===============================
+class ModelRegistry:
+    """
+    Versioned model artifacts with checksums and a local disk cache.
+
+    fetch() only downloads when the cached file is missing or its sha256
+    differs from the manifest, so restarts and repeated loads are free.
+    """
+
+    def __init__(self, store, cache_dir):
+        self.store = store
+        self.cache_dir = cache_dir
+
+    def manifest(self):
+        try:
+            return json.loads(self.store.read_text(MANIFEST_NAME))
+        except FileNotFoundError:
+            return {"active": None, "versions": {}}
+
+    def active_version(self):
+        return self.manifest().get("active")
+
+    def fetch(self, version, manifest=None):
+        """
+        Local path of a verified artifact for `version`.
+        """
+        manifest = manifest or self.manifest()
+        entry = manifest.get("versions", {}).get(version)
+        if entry is None:
+            raise ValueError(f"Unknown model version: {version}")
+
+        local_path = os.path.join(self.cache_dir, version, ARTIFACT_NAME)
+        if os.path.exists(local_path) and file_sha256(local_path) == entry["sha256"]:
+            return local_path
+
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        tmp_path = f"{local_path}.download"
+        self.store.download(entry["artifact"], tmp_path)
+
+        if file_sha256(tmp_path) != entry["sha256"]:
+            os.remove(tmp_path)
+            raise ValueError(f"Checksum mismatch for model version {version}")
+
+        os.replace(tmp_path, local_path)
+        return local_path
+
+    def load(self, version):
+        """
+        Returns:
+            model, scaler, str version
+        """
+        model, scaler, _ = open_artifact(self.fetch(version))
+        return model, scaler, version
+
+    def publish(self, artifact_path, version=None, activate=True):
+        """
+        Upload an artifact as a new version and (optionally) make it active.
+        """
+        version = version or read_header(artifact_path)["model_version"]
+        name = f"{version}/{ARTIFACT_NAME}"
+
+        self.store.upload(artifact_path, name)
+
+        manifest = self.manifest()
+        manifest.setdefault("versions", {})[version] = {
+            "artifact": name,
+            "sha256": file_sha256(artifact_path),
+            "published_at": time.time(),
+        }
+        if activate:
+            manifest["active"] = version
+
+        self.store.write_text(MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+        return version
+
+
+def get_registry():
+    """
+    Registry from config (MODEL_REGISTRY), or None when serving local files.
+    """
+    from config import MODEL_REGISTRY, MODEL_CACHE_DIR
+
+    if not MODEL_REGISTRY:
+        return None
+
+    if MODEL_REGISTRY == "bucket":
+        store = BucketModelStore()
+    elif MODEL_REGISTRY.startswith("local:"):
+        store = LocalDirModelStore(MODEL_REGISTRY[len("local:"):])
+    else:
+        raise ValueError(f"Unknown MODEL_REGISTRY: {MODEL_REGISTRY}")
+
+    return ModelRegistry(store, MODEL_CACHE_DIR)
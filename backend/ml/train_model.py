@@ -1,6 +1,15 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 import joblib
 
+# Add backend to Python path (for ml.artifact / ml.features)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.artifact import write_artifact
+from ml.features import encode_frame
+
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
@@ -18,60 +27,16 @@ for col in ["id", "Unnamed: 0"]:
         df.drop(columns=[col], inplace=True)
 
 
-df["age_years"] = (df["age"] * 100).astype(int)
-df.drop(columns=["age"], inplace=True)
-
-df["bmi"] = df["weight"] / ((df["height"] / 100) ** 2)
-
-df["chest_pain"] = df["chest_pain"].map({
-    "none": 0,
-    "mild": 1,
-    "moderate": 2,
-    "severe": 3
-})
-
-df["nausea"] = df["nausea"].map({
-    "no": 0,
-    "yes": 1
-})
+# Dataset stores age / 100; the encoder expects years like the API input
+df["age"] = (df["age"] * 100).astype(int)
 
-df["palpitations"] = df["palpitations"].map({
-    "no": 0,
-    "yes": 1
-})
-
-df["dizziness"] = df["dizziness"].map({
-    "no": 0,
-    "mild": 1,
-    "severe": 2
-})
-
-
-df.fillna(0, inplace=True)
 
 TARGET = "cardio"
 
-FEATURES = [
-    "age_years",
-    "gender",
-    "height",
-    "weight",
-    "bmi",
-    "ap_hi",
-    "ap_lo",
-    "cholesterol",
-    "gluc",
-    "smoke",
-    "alco",
-    "active",
-    "chest_pain",
-    "nausea",
-    "palpitations",
-    "dizziness"
-]
-
-X = df[FEATURES]
-y = df[TARGET]
+# Same encoder as /predict, what-if and batch scoring (float32, FEATURE_ORDER).
+# Scaled in float64, exactly like FlatScaler does at serving time.
+X = encode_frame(df).astype(np.float64)
+y = df[TARGET].fillna(0)
 
 
 X_train, X_test, y_train, y_test = train_test_split(
@@ -106,4 +71,8 @@ print("\nClassification Report:\n", classification_report(y_test, y_pred))
 joblib.dump(model, "../models/model.pkl")
 joblib.dump(scaler, "../models/scaler.pkl")
 
-print("\nModel and scaler saved successfully.")
\ No newline at end of file
+# Memory-mappable artifact used by the API (pickles stay as fallback)
+header = write_artifact("../models/model.vpf", model, scaler)
+
+print("\nModel and scaler saved successfully.")
+print("Model artifact version:", header["model_version"])
\ No newline at end of file
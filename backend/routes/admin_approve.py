@@ -1,31 +1,20 @@
 import secrets
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify
 from firebase_admin import firestore, auth
 from firebase import db
+from utils.auth import verify_admin
+from utils.hospitals import invalidate_hospital
 from utils.email_sender import send_hospital_credentials, send_welcome_kit
+from utils.admin_stats import invalidate_admin_stats
 
 admin_approve_bp = Blueprint("admin_approve", __name__)
 
-def verify_admin(request):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        raise Exception("Missing Authorization header")
-
-    id_token = auth_header.replace("Bearer ", "")
-    decoded = auth.verify_id_token(id_token)
-
-    admin_doc = db.collection("admins").document(decoded["uid"]).get()
-    if not admin_doc.exists:
-        raise Exception("Not an admin user")
-
-    return decoded
-
 
 @admin_approve_bp.route("/admin/hospital-requests/<request_id>/approve", methods=["POST"])
 def approve_hospital(request_id):
     try:
         # ADMIN AUTH
-        decoded = verify_admin(request)
+        decoded = verify_admin()
         print("STEP 1: Admin verified")
 
         # FETCH REQUEST
@@ -65,6 +54,8 @@ def approve_hospital(request_id):
             "is_first_login": True
         })
 
+        invalidate_hospital(uid=hospital_id, email=data["email"])
+
         print("STEP 4: Hospital document created")
 
         # SEND LOGIN EMAIL
@@ -87,6 +78,7 @@ def approve_hospital(request_id):
             "approved_at": firestore.SERVER_TIMESTAMP,
             "hospital_id": hospital_id
         })
+        invalidate_admin_stats()
 
         #  AUDIT LOG
         db.collection("audit_logs").add({
@@ -1,28 +1,17 @@
-from flask import Blueprint, request, jsonify
-from firebase_admin import firestore, auth
+from flask import Blueprint, jsonify
+from firebase_admin import firestore
 from firebase import db
+from utils.auth import verify_admin
 from utils.email_sender import send_rejection_email
+from utils.admin_stats import invalidate_admin_stats
 
 admin_reject_bp = Blueprint("admin_reject", __name__)
 
-def verify_admin(request):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        raise Exception("Missing Authorization header")
-
-    id_token = auth_header.replace("Bearer ", "")
-    decoded = auth.verify_id_token(id_token)
-
-    if not db.collection("admins").document(decoded["uid"]).get().exists:
-        raise Exception("Not an admin user")
-
-    return decoded
-
 
 @admin_reject_bp.route("/admin/hospital-requests/<request_id>/reject", methods=["POST"])
 def reject_hospital(request_id):
     try:
-        decoded = verify_admin(request)
+        decoded = verify_admin()
 
         req_ref = db.collection("hospital_requests").document(request_id)
         req_doc = req_ref.get()
@@ -38,6 +27,7 @@ def reject_hospital(request_id):
             "status": "rejected",
             "rejected_at": firestore.SERVER_TIMESTAMP
         })
+        invalidate_admin_stats()
 
      
         db.collection("audit_logs").add({
@@ -1,31 +1,14 @@
 from flask import Blueprint, request, jsonify
-from firebase_admin import auth
 from firebase import db
+from utils.auth import verify_admin
 
 admin_requests_bp = Blueprint("admin_requests", __name__)
 
 
-def verify_admin(request):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        raise Exception("Missing Authorization header")
-
-    id_token = auth_header.replace("Bearer ", "")
-    decoded = auth.verify_id_token(id_token)
-
-    uid = decoded["uid"]
-
-    admin_doc = db.collection("admins").document(uid).get()
-    if not admin_doc.exists:
-        raise Exception("Not an admin user")
-
-    return decoded
-
-
 @admin_requests_bp.route("/admin/hospital-requests", methods=["GET"])
 def list_hospital_requests():
     try:
-        verify_admin(request)
+        verify_admin()
 
         status = request.args.get("status", "pending")
 
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from firebase_admin import auth, firestore
 from firebase import db
-from utils.auth import verify_admin_token
+from utils.auth import admin_from_claims, current_claims
+from utils.hospitals import remember_hospital
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -20,12 +21,7 @@ def me():
         return "", 200
 
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        decoded = auth.verify_id_token(id_token)
+        decoded = current_claims()
 
         hospital_id = decoded["uid"]
 
@@ -35,6 +31,10 @@ def me():
 
         hospital = hospital_doc.to_dict()
 
+        # Warm the uid/email -> hospital_id cache used by /predict and /timeline
+        if hospital.get("email") == decoded.get("email"):
+            remember_hospital(hospital_id, decoded.get("email"), hospital_id)
+
         return jsonify({
             "hospital_id": hospital_id,
             "name": hospital.get("name"),
@@ -52,12 +52,7 @@ def me():
 @auth_bp.route("/auth/signup", methods=["POST"])
 def signup_hospital():
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Admin authorization missing")
-
-        admin_token = auth_header.replace("Bearer ", "").strip()
-        verify_admin_token(admin_token)
+        admin_from_claims(current_claims("Admin authorization missing"))
 
         data = request.get_json()
         if not data:
@@ -95,12 +90,7 @@ def signup_hospital():
 @auth_bp.route("/auth/complete-onboarding", methods=["POST"])
 def complete_onboarding():
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        decoded = auth.verify_id_token(id_token)
+        decoded = current_claims("Authorization missing")
 
         hospital_id = decoded["uid"]
 
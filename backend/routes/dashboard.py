@@ -1,87 +1,31 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, g, jsonify
 from firebase import db
-from firebase_admin import firestore
-from utils.auth import verify_hospital_token
-from datetime import datetime, timedelta, timezone
+from utils.auth import current_hospital
+from utils.dashboard_rollup import analytics_view, read_rollup, scan_rollup
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
 
 @dashboard_bp.route("/dashboard/analytics", methods=["GET"])
 def dashboard_analytics():
+    """
+    Patient counters from the hospital's rollup shards (O(1) reads), or
+    from a patient scan until the rollup has been rebuilt.
+    """
     try:
         
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if g.get("id_token") is None:
             return jsonify({"error": "Authorization token missing"}), 401
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
-        patients_ref = (
-            db.collection("hospitals")
-            .document(hospital_id)
-            .collection("patients")
-        )
+        rollup = read_rollup(db, hospital_id)
+        if rollup is None:
+            # Not rebuilt yet (scripts/rebuild_dashboard_rollups.py): count
+            # from the patient documents without touching the shards
+            rollup = scan_rollup(db, hospital_id)
 
-        now = datetime.now(timezone.utc)
-        today_start = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
-
-        total_patients = 0
-        deleted_patients = 0
-        new_today = 0
-        new_last_7_days = 0
-
-       
-        daily_counts = {}
-
-        for doc in patients_ref.stream():
-            d = doc.to_dict()
-            total_patients += 1
-
-            if d.get("is_deleted") is True:
-                deleted_patients += 1
-                continue
-
-            created_at = d.get("created_at")
-            if not created_at:
-                continue
-
-            created_dt = created_at.replace(tzinfo=timezone.utc)
-            created_date = created_dt.date()
-
-           
-            if created_dt >= today_start:
-                new_today += 1
-
-            
-            if created_dt >= today_start - timedelta(days=6):
-                new_last_7_days += 1
-
-            
-            day_key = created_date.isoformat()
-            daily_counts[day_key] = daily_counts.get(day_key, 0) + 1
-
-       
-        daily_list = []
-        start_date = today_start.date() - timedelta(days=29)
-
-        for i in range(30):
-            day = start_date + timedelta(days=i)
-            key = day.isoformat()
-
-            daily_list.append({
-                "date": key,
-                "count": daily_counts.get(key, 0)
-            })
-
-        return jsonify({
-            "total_patients": total_patients,
-            "deleted_patients": deleted_patients,
-            "new_today": new_today,
-            "new_last_7_days": new_last_7_days,
-            "daily_counts": daily_list
-        }), 200
+        return jsonify(analytics_view(rollup)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -3,7 +3,7 @@ from datetime import timedelta
 from firebase_admin import firestore
 
 from firebase import db
-from utils.auth import verify_hospital_token
+from utils.auth import current_hospital
 
 doctor_notes_bp = Blueprint("doctor_notes", __name__)
 
@@ -24,12 +24,7 @@ def get_record_ref(hospital_id, patient_id, record_id):
 def add_doctor_note(patient_id, record_id):
     try:
         # Auth
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         # Input
         data = request.get_json()
@@ -86,12 +81,7 @@ def add_doctor_note(patient_id, record_id):
 def edit_doctor_note(patient_id, record_id):
     try:
         #  Auth
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         #  Input
         data = request.get_json()
@@ -139,12 +129,7 @@ def edit_doctor_note(patient_id, record_id):
 )
 def get_doctor_note(patient_id, record_id):
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         record_ref = get_record_ref(hospital_id, patient_id, record_id)
         record_doc = record_ref.get()
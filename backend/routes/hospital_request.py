@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from firebase_admin import firestore
 from firebase import db
 from utils.email_sender import send_admin_new_request_email
+from utils.admin_stats import invalidate_admin_stats
 
 hospital_request_bp = Blueprint("hospital_request", __name__)
 
@@ -59,6 +60,7 @@ def create_hospital_request():
             "status": "pending",
             "created_at": firestore.SERVER_TIMESTAMP
         })
+        invalidate_admin_stats()
 
         #  AUTO-EMAIL ADMIN (NON-BLOCKING)
         try:
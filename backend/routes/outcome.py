@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from firebase import db
-from utils.auth import verify_hospital_token
-from firebase_admin import firestore
+from utils.auth import current_hospital
+from utils.patient_summary import mark_cardiac_arrest
 
 outcome_bp = Blueprint("outcome", __name__)
 
@@ -10,12 +10,7 @@ outcome_bp = Blueprint("outcome", __name__)
 def mark_patient_outcome(patient_id):
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(token)
+        hospital_id, _ = current_hospital()
 
         data = request.get_json()
         cardiac_arrest = data.get("cardiac_arrest")
@@ -30,26 +25,18 @@ def mark_patient_outcome(patient_id):
             .document(patient_id)
         )
 
-        patient_doc = patient_ref.get()
-        if not patient_doc.exists:
+        #  SAVE ONCE (IMMUTABLE) + patient.summary, one transaction
+        status = mark_cardiac_arrest(db, patient_ref)
+
+        if status == "missing":
             raise ValueError("Patient not found")
 
-        #  CHECK IF ALREADY MARKED
-        existing = patient_doc.to_dict().get("outcome", {})
-        if existing.get("cardiac_arrest") == 1:
+        if status == "locked":
             return jsonify({
                 "message": "Outcome already locked",
                 "cardiac_arrest": 1
             }), 200
 
-        #  SAVE ONCE (IMMUTABLE)
-        patient_ref.set({
-            "outcome": {
-                "cardiac_arrest": 1,
-                "marked_at": firestore.SERVER_TIMESTAMP
-            }
-        }, merge=True)
-
         return jsonify({
             "message": "Cardiac arrest outcome saved and locked",
             "cardiac_arrest": 1
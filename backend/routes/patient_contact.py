@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from firebase import db
 from firebase_admin import firestore
-from utils.auth import verify_hospital_token
+from utils.auth import current_hospital
 
 patient_contact_bp = Blueprint("patient_contact", __name__)
 
@@ -10,13 +10,7 @@ patient_contact_bp = Blueprint("patient_contact", __name__)
 def update_patient_contact(patient_id):
     try:
 
-        auth_header = request.headers.get("Authorization")
-
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
 
         data = request.get_json()
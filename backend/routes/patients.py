@@ -1,7 +1,27 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
 from firebase import db
 from firebase_admin import firestore
-from utils.auth import verify_hospital_token
+from utils.auth import current_hospital
+from utils.patient_summary import (
+    delete_visit,
+    empty_summary,
+    is_complete_summary,
+    mark_cardiac_arrest,
+    summary_view,
+)
+from utils.patient_ids import generate_patient_id
+from utils.dashboard_rollup import record_patient_created, record_patient_deleted
+from utils.duplicate_index import get_duplicate_index, index_patient, unindex_patient
+from utils.patient_index import (
+    MIN_SEARCH_PREFIX,
+    MOBILE_PREFIX_TAG,
+    matches_name_tokens,
+    mobile_digits,
+    normalize_name,
+    patient_index_fields,
+    search_key,
+)
+from datetime import datetime, timezone
 import re
 
 EMAIL_REGEX = re.compile(
@@ -21,38 +41,11 @@ def is_valid_email(email):
 patients_bp = Blueprint("patients", __name__)
 
 
-def generate_patient_id(hospital_id):
-    counter_ref = (
-        db.collection("hospitals")
-        .document(hospital_id)
-        .collection("meta")
-        .document("patient_counter")
-    )
-
-    counter_doc = counter_ref.get()
-
-    if not counter_doc.exists:
-        last_id = 0
-    else:
-        last_id = counter_doc.to_dict().get("last_id", 0)
-
-    new_id = last_id + 1
-    counter_ref.set({"last_id": new_id})
-
-    return str(new_id).zfill(12)
-    
-
-
 @patients_bp.route("/patients", methods=["POST"])
 def create_patient():
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         data = request.get_json()
 
@@ -97,6 +90,8 @@ def create_patient():
         if not is_valid_email(guardian_email):
             raise ValueError("Invalid guardian email")
 
+        created_at = datetime.now(timezone.utc)
+
         patient_data = {
             "patient_id": patient_id,
             "name": name,
@@ -109,15 +104,31 @@ def create_patient():
             "patient_email": data.get("patient_email"),
             "guardian_email": data.get("guardian_email"),
 
-            "created_at": firestore.SERVER_TIMESTAMP,
-            "is_deleted": False
+            # One timestamp for the patient and its dashboard day bucket
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": False,
+
+            # No records yet: the first visit needn't seed it from records
+            "summary": empty_summary(),
+
+            **patient_index_fields(name, primary_mobile_norm)
         }
 
-        db.collection("hospitals") \
-          .document(hospital_id) \
-          .collection("patients") \
-          .document(patient_id) \
-          .set(patient_data)
+        #  Patient + dashboard counters in one atomic batch
+        batch = db.batch()
+        #  create() fails instead of overwriting if the id is ever taken
+        batch.create(
+            db.collection("hospitals")
+            .document(hospital_id)
+            .collection("patients")
+            .document(patient_id),
+            patient_data
+        )
+        record_patient_created(batch, db, hospital_id, created_at)
+        batch.commit()
+
+        index_patient(hospital_id, patient_id, name, age, primary_mobile)
 
         return jsonify({
             "message": "Patient created successfully",
@@ -129,48 +140,75 @@ def create_patient():
 
 
 
+# Search results, and the documents read to find them (extra name tokens
+# are filtered after the array_contains lookup)
+MAX_SEARCH_RESULTS = 20
+SEARCH_SCAN_LIMIT = 100
+
+SEARCH_RESULT_FIELDS = [
+    "patient_id",
+    "name",
+    "age",
+    "gender",
+    "primary_mobile",
+    "created_at",
+    "is_deleted",
+]
+
+
 @patients_bp.route("/patients/search", methods=["GET"])
 def search_patient_by_mobile():
+    """
+    ?q= full mobile (equality on primary_mobile_norm), mobile digit
+    prefix or name token prefixes (array_contains on search_prefixes).
+    """
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         q = request.args.get("q", "").strip()
-        if len(q) < 3:
+        if len(q) < MIN_SEARCH_PREFIX:
             return jsonify({"patients": []})
 
-        q_norm = "".join(filter(str.isdigit, q))
-
-        patients_ref = (
+        patients_col = (
             db.collection("hospitals")
             .document(hospital_id)
             .collection("patients")
-            .order_by("created_at", direction=firestore.Query.DESCENDING)
-            .limit(50)
         )
 
+        q_norm = mobile_digits(q)
+        key, name_query = search_key(q)
+
+        if key is None:
+            return jsonify({"patients": []})
+
+        if len(q_norm) >= 10 and key.startswith(MOBILE_PREFIX_TAG):
+            #  Full number → exact match on the normalized mobile
+            query = patients_col.where("primary_mobile_norm", "==", q_norm[-10:])
+        else:
+            #  Partial mobile / name → stored prefix array
+            query = patients_col.where("search_prefixes", "array_contains", key)
+
         matches = []
 
-        for doc in patients_ref.stream():
+        for doc in query.select(SEARCH_RESULT_FIELDS).limit(SEARCH_SCAN_LIMIT).stream():
             d = doc.to_dict()
 
+            if name_query and not matches_name_tokens(d.get("name"), name_query):
+                continue
 
-            mobile_norm = d.get("primary_mobile_norm", "")
-            if q_norm == mobile_norm:
-                matches.append({
-                    "patient_id": d["patient_id"],
-                    "name": d["name"],
-                    "age": d["age"],
-                    "gender": d["gender"],
-                    "primary_mobile": d["primary_mobile"],
-                     "created_at": d.get("created_at"),
-                     "is_deleted": d.get("is_deleted", False)
-                })
+            matches.append({
+                "patient_id": d["patient_id"],
+                "name": d["name"],
+                "age": d["age"],
+                "gender": d["gender"],
+                "primary_mobile": d["primary_mobile"],
+                "created_at": d.get("created_at"),
+                "is_deleted": d.get("is_deleted", False)
+            })
+
+            if len(matches) >= MAX_SEARCH_RESULTS:
+                break
 
         return jsonify({
             "count": len(matches),
@@ -182,43 +220,140 @@ def search_patient_by_mobile():
 
 
 
+# Fields returned by the patient list (Firestore select() projection)
+PATIENT_LIST_FIELDS = [
+    "patient_id",
+    "name",
+    "age",
+    "gender",
+    "primary_mobile",
+    "created_at",
+    "is_deleted",
+    "deleted_at",
+    "summary",
+]
+
+DEFAULT_PATIENT_PAGE = 50
+MAX_PATIENT_PAGE = 200
+
+
+def parse_date_arg(name):
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def build_patient_list_query(patients_col):
+    """
+    Filtered, ordered and projected patients query from request args.
+
+    deleted=true|false|all, gender=, created_from=, created_to=, name=<prefix>
+    (name prefix is ordered by name, everything else newest first).
+    """
+    query = patients_col
+
+    deleted = request.args.get("deleted", "all").lower()
+    if deleted not in ("true", "false", "all"):
+        raise ValueError("deleted must be true, false or all")
+    if deleted != "all":
+        query = query.where("is_deleted", "==", deleted == "true")
+
+    gender = request.args.get("gender")
+    if gender:
+        query = query.where("gender", "==", int(gender) if gender.isdigit() else gender)
+
+    created_from = parse_date_arg("created_from")
+    created_to = parse_date_arg("created_to")
+    name_prefix = normalize_name(request.args.get("name"))
+
+    if name_prefix and (created_from or created_to):
+        raise ValueError("name cannot be combined with a created date range")
+
+    if name_prefix:
+        query = (
+            query
+            .where("name_lower", ">=", name_prefix)
+            .where("name_lower", "<", name_prefix + "\uf8ff")
+            .order_by("name_lower")
+        )
+        order_field = "name_lower"
+    else:
+        if created_from:
+            query = query.where("created_at", ">=", created_from)
+        if created_to:
+            query = query.where("created_at", "<", created_to)
+        query = query.order_by("created_at", direction=firestore.Query.DESCENDING)
+        order_field = "created_at"
+
+    return query.select(PATIENT_LIST_FIELDS), order_field
+
+
 @patients_bp.route("/patients", methods=["GET"])
 def list_patients():
+    """
+    One page of patients: ?limit=&cursor= plus the filters in
+    build_patient_list_query. next_cursor is the last patient_id.
+    """
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
+        hospital_id, _ = current_hospital()
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        limit = int(request.args.get("limit", DEFAULT_PATIENT_PAGE))
+        if not (1 <= limit <= MAX_PATIENT_PAGE):
+            raise ValueError(f"limit must be between 1 and {MAX_PATIENT_PAGE}")
 
-        patients_ref = (
+        patients_col = (
             db.collection("hospitals")
             .document(hospital_id)
             .collection("patients")
-            .order_by("created_at", direction=firestore.Query.DESCENDING)
         )
 
+        patients_ref, order_field = build_patient_list_query(patients_col)
+
+        cursor = request.args.get("cursor")
+        if cursor:
+            cursor_doc = patients_col.document(cursor).get(field_paths=[order_field])
+            if not cursor_doc.exists:
+                raise ValueError("Invalid cursor")
+            patients_ref = patients_ref.start_after(cursor_doc)
+
+        # One extra document tells us whether another page exists
+        docs = list(patients_ref.limit(limit + 1).stream())
+        has_more = len(docs) > limit
+
         patients = []
 
-        for doc in patients_ref.stream():
+        for doc in docs[:limit]:
             d = doc.to_dict()
 
             patients.append({
-                "patient_id": d["patient_id"],
-                "name": d["name"],
-                "age": d["age"],
-                "gender": d["gender"],
-                "primary_mobile": d["primary_mobile"],
+                "patient_id": d.get("patient_id", doc.id),
+                "name": d.get("name"),
+                "age": d.get("age"),
+                "gender": d.get("gender"),
+                "primary_mobile": d.get("primary_mobile"),
                 "created_at": d.get("created_at"),
-                "is_deleted": d.get("is_deleted", False)
+                "is_deleted": d.get("is_deleted", False),
+                "deleted_at": d.get("deleted_at"),
+                "summary": summary_view(d["summary"]) if is_complete_summary(d.get("summary")) else None
             })
 
         return jsonify({
             "count": len(patients),
-            "patients": patients
+            "patients": patients,
+            "has_more": has_more,
+            "next_cursor": docs[limit - 1].id if has_more else None
         })
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -227,12 +362,7 @@ def list_patients():
 @patients_bp.route("/patients/<patient_id>", methods=["GET"])
 def get_patient(patient_id):
     try:
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         patient_ref = (
             db.collection("hospitals")
@@ -265,16 +395,44 @@ def get_patient(patient_id):
 
 
 
+@firestore.transactional
+def _soft_delete(transaction, patient_ref, hospital_id):
+    """
+    Wipes the patient and moves it to the deleted counter atomically
+    (a concurrent second delete sees is_deleted and is rejected).
+    """
+    snap = patient_ref.get(transaction=transaction)
+    if not snap.exists:
+        return "missing"
+
+    patient = snap.to_dict()
+
+    if patient.get("is_deleted") is True:
+        return "deleted"
+
+    transaction.update(patient_ref, {
+        "is_deleted": True,
+        "deleted_at": firestore.SERVER_TIMESTAMP,
+        "updated_at": firestore.SERVER_TIMESTAMP,
+        "deleted_reason": "manual_soft_delete",
+
+        # PII wipe
+        "name": "DELETED_PATIENT",
+        **patient_index_fields(None),
+        "primary_mobile": None,
+        "primary_mobile_norm": None,
+        "patient_email": None,
+        "guardian_email": None,
+    })
+    record_patient_deleted(transaction, db, hospital_id, patient.get("created_at"))
+    return "ok"
+
+
 @patients_bp.route("/patients/<patient_id>/soft-delete", methods=["POST"])
 def soft_delete_patient(patient_id):
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         patient_ref = (
             db.collection("hospitals")
@@ -283,27 +441,15 @@ def soft_delete_patient(patient_id):
             .document(patient_id)
         )
 
-        snap = patient_ref.get()
-        if not snap.exists:
-            return jsonify({"error": "Patient not found"}), 404
+        status = _soft_delete(db.transaction(), patient_ref, hospital_id)
 
-        patient = snap.to_dict()
+        if status == "missing":
+            return jsonify({"error": "Patient not found"}), 404
 
-        if patient.get("is_deleted") is True:
+        if status == "deleted":
             return jsonify({"error": "Patient already deleted"}), 400
 
-        patient_ref.update({
-            "is_deleted": True,
-            "deleted_at": firestore.SERVER_TIMESTAMP,
-            "deleted_reason": "manual_soft_delete",
-
-            # PII wipe
-            "name": "DELETED_PATIENT",
-            "primary_mobile": None,
-            "primary_mobile_norm": None,
-            "patient_email": None,
-            "guardian_email": None,
-        })
+        unindex_patient(hospital_id, patient_id)
 
         return jsonify({
             "success": True,
@@ -318,12 +464,10 @@ def soft_delete_patient(patient_id):
 def update_patient(patient_id):
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if g.get("id_token") is None:
             return jsonify({"error": "Authorization token missing"}), 401
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         data = request.get_json() or {}
 
@@ -354,6 +498,9 @@ def update_patient(patient_id):
             name = data["name"].strip()
             if name:
                 update_fields["name"] = name
+                update_fields.update(
+                    patient_index_fields(name, patient.get("primary_mobile_norm"))
+                )
 
         if "age" in data:
             try:
@@ -395,6 +542,15 @@ def update_patient(patient_id):
 
         patient_ref.update(update_fields)
 
+        if "name" in update_fields or "age" in update_fields:
+            index_patient(
+                hospital_id,
+                patient_id,
+                update_fields.get("name", patient.get("name")),
+                update_fields.get("age", patient.get("age")),
+                patient.get("primary_mobile")
+            )
+
         return jsonify({
             "success": True,
             "updated_fields": list(update_fields.keys())
@@ -405,16 +561,18 @@ def update_patient(patient_id):
 
 @patients_bp.route("/patients/duplicate-check", methods=["GET"])
 def duplicate_check():
+    """
+    Similar names (trigram similarity) within +/- 1 year of `age`,
+    from the hospital's cached name index.
+    """
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if g.get("id_token") is None:
             return jsonify({"error": "Authorization token missing"}), 401
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
-        name = request.args.get("name", "").strip().lower()
+        name = request.args.get("name", "").strip()
         age = request.args.get("age", "").strip()
 
         if not name or not age:
@@ -425,32 +583,24 @@ def duplicate_check():
         except:
             return jsonify({"matches": []})
 
-        patients_ref = (
+        patients_col = (
             db.collection("hospitals")
             .document(hospital_id)
             .collection("patients")
-            .where("age", "==", age)
-            .limit(10)
         )
 
-        matches = []
-
-        for doc in patients_ref.stream():
-            d = doc.to_dict()
-
-            existing_name = d.get("name", "").lower()
+        index = get_duplicate_index(hospital_id, patients_col)
 
-            # simple fuzzy check
-            if name in existing_name or existing_name in name:
-                matches.append({
-                    "patient_id": d.get("patient_id"),
-                    "name": d.get("name"),
-                    "age": d.get("age"),
-                    "primary_mobile": d.get("primary_mobile")
-                })
-
-            if len(matches) >= 3:
-                break
+        matches = [
+            {
+                "patient_id": p["patient_id"],
+                "name": p["name"],
+                "age": p["age"],
+                "primary_mobile": p["primary_mobile"],
+                "similarity": round(similarity, 3)
+            }
+            for similarity, p in index.search(name, age)
+        ]
 
         return jsonify({
             "count": len(matches),
@@ -465,12 +615,10 @@ def duplicate_check():
 def set_patient_outcome(patient_id):
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if g.get("id_token") is None:
             return jsonify({"error": "Authorization token missing"}), 401
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
         data = request.get_json() or {}
 
@@ -484,24 +632,15 @@ def set_patient_outcome(patient_id):
             .document(patient_id)
         )
 
-        snap = patient_ref.get()
-        if not snap.exists:
-            return jsonify({"error": "Patient not found"}), 404
+        #  LOCK ONCE, AT PATIENT LEVEL (ML SAFE) + patient.summary
+        status = mark_cardiac_arrest(db, patient_ref)
 
-        patient = snap.to_dict()
+        if status == "missing":
+            return jsonify({"error": "Patient not found"}), 404
 
-        #  LOCK ONCE
-        if patient.get("outcome", {}).get("cardiac_arrest") == 1:
+        if status == "locked":
             return jsonify({"message": "Outcome already locked"}), 200
 
-        #  WRITE AT PATIENT LEVEL (ML SAFE)
-        patient_ref.update({
-            "outcome": {
-                "cardiac_arrest": 1,
-                "marked_at": firestore.SERVER_TIMESTAMP
-            }
-        })
-
         return jsonify({
             "success": True,
             "message": "Cardiac arrest outcome saved"
@@ -517,29 +656,23 @@ def set_patient_outcome(patient_id):
 def hard_delete_record(patient_id, record_id):
     try:
         #  AUTH
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if g.get("id_token") is None:
             return jsonify({"error": "Authorization token missing"}), 401
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        hospital_id, _ = verify_hospital_token(id_token)
+        hospital_id, _ = current_hospital()
 
-        record_ref = (
+        patient_ref = (
             db.collection("hospitals")
             .document(hospital_id)
             .collection("patients")
             .document(patient_id)
-            .collection("records")
-            .document(record_id)
         )
+        record_ref = patient_ref.collection("records").document(record_id)
 
-        snap = record_ref.get()
-        if not snap.exists:
+        #  HARD DELETE (+ patient.summary, one transaction)
+        if not delete_visit(db, patient_ref, record_ref):
             return jsonify({"error": "Record not found"}), 404
 
-        #  HARD DELETE
-        record_ref.delete()
-
         return jsonify({
             "success": True,
             "message": "Record permanently deleted"
@@ -1,16 +1,26 @@
 from flask import Blueprint, request, jsonify
-import joblib
+import json
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
-from ml.preprocess import preprocess_input
+from ml.features import FEATURE_ORDER, encode_one, encode_records
 from utils.validators import validate_input
 from utils.risk_mapper import map_risk
-from utils.explain import get_top_features, explain_symptoms
-from utils.auth import verify_hospital_token
+from utils.explain import get_feature_contributions, explain_symptoms
+from utils.auth import current_hospital
+from utils.hospitals import get_hospital_id
 from utils.schema import validate_record_schema
-from config import MODEL_PATH, SCALER_PATH
+from utils.patient_summary import save_visit, save_visits
+from utils.outcome_propagation import schedule_cardiac_arrest_propagation
+from ml.predictor import current_model, model_for_version
+from ml.batcher import InferenceBatcher
+from utils.cache import TTLCache
 
 from utils.human_explain import generate_explanation
-from utils.what_if import what_if_analysis
+from utils.what_if import what_if_analysis, what_if_batch
+from utils.sensitivity import sensitivity_analysis
+from utils.counterfactual import counterfactual_search
 from utils.confidence import prediction_confidence
 from utils.ecg_validator import validate_ecg
 from utils.ecg_flags import generate_ecg_flags
@@ -18,89 +28,51 @@ from utils.ecg_risk_delta import calculate_ecg_risk_delta
 from firebase_admin import firestore
 
 from firebase import db
-
-#  Load ONCE at startup (fast + safe)
-model = joblib.load(MODEL_PATH)
-scaler = joblib.load(SCALER_PATH)
+from config import (
+    INFERENCE_BATCHING,
+    INFERENCE_BATCH_WINDOW_MS,
+    INFERENCE_BATCH_MAX_ROWS,
+    COUNTERFACTUAL_BUDGET_MS,
+    EXPLANATION_WORKERS,
+    BATCH_SAVE_WORKERS
+)
+
+# Concurrent single-visit calls share one forest pass
+inference = InferenceBatcher(
+    window_ms=INFERENCE_BATCH_WINDOW_MS,
+    max_batch=INFERENCE_BATCH_MAX_ROWS,
+    enabled=INFERENCE_BATCHING
+)
 
 predict_bp = Blueprint("predict", __name__)
 
-def get_hospital_id_by_email(email: str) -> str:
-    hospitals = (
-        db.collection("hospitals")
-        .where("email", "==", email)
-        .limit(1)
-        .stream()
-    )
-
-    for hospital in hospitals:
-        return hospital.id
-
-    raise ValueError("Hospital not registered in Firestore")
-
-
-CHEST_PAIN_MAP = {
-    "none": 0,
-    "mild": 1,
-    "moderate": 2,
-    "severe": 3
-}
-
-YES_NO_MAP = {
-    0: 0,
-    1: 1,
-    "no": 0,
-    "yes": 1,
-    False: 0,
-    True: 1
-}
+# Preview (save: false) and save send the same visit twice in a row
+PREDICTION_CACHE_MAXSIZE = 2048
+PREDICTION_CACHE_TTL_SECONDS = 600
 
+prediction_cache = TTLCache(
+    maxsize=PREDICTION_CACHE_MAXSIZE,
+    ttl=PREDICTION_CACHE_TTL_SECONDS
+)
 
 def build_model_input(input_data: dict):
     """
     Builds ML-ready feature vector EXACTLY as model expects
+    (shared encoder: same encoding as training and what-if)
     """
-
-    age_years = input_data["age"]
-
-    height = input_data["height"]
-    weight = input_data["weight"]
-
-    bmi = round(weight / ((height / 100) ** 2), 2)
-
-    #  ENCODE STRINGS → NUMBERS HERE
-    chest_pain_raw = input_data.get("chest_pain", "none")
-    chest_pain = CHEST_PAIN_MAP.get(str(chest_pain_raw).lower(), 0)
-
-    feature_vector = [[
-        age_years,
-        int(input_data["gender"]),
-        height,
-        weight,
-        bmi,
-        input_data["ap_hi"],
-        input_data["ap_lo"],
-        input_data["cholesterol"],
-        input_data["gluc"],
-        YES_NO_MAP.get(input_data.get("smoke"), 0),
-        YES_NO_MAP.get(input_data.get("alco"), 0),
-        YES_NO_MAP.get(input_data.get("active"), 0),
-        chest_pain,  # ✅FIXED
-        YES_NO_MAP.get(input_data.get("nausea"), 0),
-        YES_NO_MAP.get(input_data.get("palpitations"), 0),
-        YES_NO_MAP.get(input_data.get("dizziness"), 0),
-    ]]
-
-    return feature_vector, bmi
+    features, bmi = encode_one(input_data)
+    return features[np.newaxis, :], bmi
 
 def build_patient_risk_factors(input_data, bmi):
     factors = []
 
-    if input_data["ap_hi"] >= 140:
+    ap_hi = int(input_data["ap_hi"])
+
+    if ap_hi >= 140:
         factors.append({
             "label": "High Blood Pressure",
             "severity": "high",
-            "score": min(100, int((input_data["ap_hi"] - 120) * 1.5))
+            "score": min(100, int((ap_hi - 120) * 1.5))
         })
 
     if bmi >= 25:
@@ -110,21 +82,21 @@ def build_patient_risk_factors(input_data, bmi):
             "score": min(100, int((bmi - 23) * 10))
         })
 
-    if input_data["cholesterol"] == 1:
+    if int(input_data["cholesterol"]) == 1:
         factors.append({
             "label": "High Cholesterol",
             "severity": "medium",
             "score": 60
         })
 
-    if input_data["gluc"] == 1:
+    if int(input_data["gluc"]) == 1:
         factors.append({
             "label": "High Blood Glucose",
             "severity": "medium",
             "score": 60
         })
 
-    if input_data["smoke"] == 1:
+    if int(input_data["smoke"]) == 1:
         factors.append({
             "label": "Smoking Habit",
             "severity": "high",
@@ -134,20 +106,275 @@ def build_patient_risk_factors(input_data, bmi):
     return factors[:3]
 
 
+def prepare_ecg(ecg_raw, gender):
+    """
+    Validates optional ECG values and derives flags + risk delta.
+    """
+    ecg = None
+    ecg_flags = {"status": "not_recorded", "flags": []}
+    ecg_risk_delta = {"delta": 0.0, "reasons": []}
+
+    if ecg_raw:
+        ecg = {k: v for k, v in ecg_raw.items() if v is not None}
+        if ecg:
+            validate_ecg(ecg)
+            ecg_flags = generate_ecg_flags(ecg, gender)
+            ecg_risk_delta = calculate_ecg_risk_delta(ecg)
+
+    return ecg, ecg_flags, ecg_risk_delta
+
+
+def build_record(
+    input_data,
+    bmi,
+    probability,
+    risk_level,
+    confidence,
+    symptom_insights,
+    top_factors,
+    what_if,
+    ecg,
+    ecg_flags,
+    ecg_risk_delta,
+    doctor_note_text=None,
+    cardiac_arrest=0,
+    confirmed_by=None,
+    model_version=None,
+    feature_contributions=None,
+    explanation=None,
+    explanation_status="ready"
+):
+    """
+    Builds the Firestore record document for one scored visit.
+    """
+    return {
+        "created_at": firestore.SERVER_TIMESTAMP,
+
+        "input": {
+            "age": input_data["age"],
+            "gender": input_data["gender"],
+            "height": input_data["height"],
+            "weight": input_data["weight"],
+            "ap_hi": input_data["ap_hi"],
+            "ap_lo": input_data["ap_lo"],
+            "cholesterol": input_data["cholesterol"],
+            "gluc": input_data["gluc"],
+            "smoke": input_data["smoke"],
+            "alco": input_data["alco"],
+            "active": input_data["active"],
+            "chest_pain": input_data.get("chest_pain"),
+            "nausea": input_data.get("nausea"),
+            "palpitations": input_data.get("palpitations"),
+            "dizziness": input_data.get("dizziness"),
+        },
+
+        "derived": {
+            "bmi": bmi,
+            "ecg_risk_delta": ecg_risk_delta
+        },
+
+        "prediction": {
+            "probability": round(float(probability), 3),
+            "risk_level": risk_level,
+            "confidence": confidence,
+        },
+        "model_version": model_version,
+        "risk_level": risk_level,
+        "probability": round(float(probability), 3),
+        "confidence": confidence,
+
+        "symptom_insights": symptom_insights,
+        "top_factors": top_factors,
+        "feature_contributions": feature_contributions,
+        "what_if": what_if,
+        "explanation": explanation,
+        "explanation_status": explanation_status,
+
+        "ecg": ecg,
+        "ecg_flags": ecg_flags,
+
+        "doctor_notes": (
+            {
+                "text": doctor_note_text.strip(),
+                "created_at": firestore.SERVER_TIMESTAMP,
+                "locked": True
+            }
+            if doctor_note_text
+            else None
+        ),
+
+        
+        "outcome": {
+            "cardiac_arrest": cardiac_arrest,
+            "confirmed_by": confirmed_by,
+            "confirmed_at": firestore.SERVER_TIMESTAMP if cardiac_arrest == 1 else None
+        }
+    }
+
+
+def prediction_cache_key(input_data, ecg, model_version):
+    """
+    Canonical key: model version + encoded feature vector + ECG values.
+    """
+    features, _ = encode_one(input_data)
+    return (
+        model_version,
+        tuple(float(v) for v in features),
+        json.dumps(ecg, sort_keys=True) if ecg else None
+    )
+
+
+# Blocks that /predict can defer ("defer_explanations": true) and fill in later
+EXPLANATION_FIELDS = (
+    "top_factors",
+    "feature_contributions",
+    "symptom_insights",
+    "explanation",
+    "what_if",
+)
+
+PENDING_EXPLANATIONS = {
+    "top_factors": [],
+    "feature_contributions": None,
+    "symptom_insights": [],
+    "explanation": None,
+    "what_if": [],
+}
+
+
+def explain_visit(input_data, bmi, serving, X_scaled=None):
+    """
+    Explanation blocks for one validated input (the slow part of /predict).
+    """
+    if X_scaled is None:
+        X_raw, _ = build_model_input(input_data)
+        X_scaled = serving.scaler.transform(X_raw)
+
+    scorer = inference.bind(serving.model)
+
+    return {
+        "top_factors": build_patient_risk_factors(input_data, bmi),
+        "feature_contributions": get_feature_contributions(
+            serving.model, X_scaled, FEATURE_ORDER
+        )[0],
+        "symptom_insights": explain_symptoms(input_data),
+        "explanation": generate_explanation(input_data, bmi),
+        "what_if": what_if_analysis(scorer, input_data, serving.scaler),
+    }
+
+
+def score_visit(input_data, ecg_raw, defer_explanations=False):
+    """
+    Inference + explanation blocks for one validated input.
+
+    Identical visits (preview, then save) are served from prediction_cache.
+    With defer_explanations=True a cache miss only scores the risk; the
+    explanation blocks come back empty and explanation_status is "pending".
+    """
+    serving = current_model()
+
+    ecg_clean = {k: v for k, v in (ecg_raw or {}).items() if v is not None}
+    key = prediction_cache_key(input_data, ecg_clean, serving.version)
+
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ecg, ecg_flags, ecg_risk_delta = prepare_ecg(ecg_clean, input_data.get("gender"))
+
+    X_raw, bmi = build_model_input(input_data)
+    X_scaled = serving.scaler.transform(X_raw)
+
+    scorer = inference.bind(serving.model)
+    probability = float(scorer.predict_proba(X_scaled)[0][1])
+
+    scored = {
+        "probability": probability,
+        "risk_level": map_risk(probability),
+        "confidence": prediction_confidence(probability),
+        "bmi": bmi,
+        "ecg": ecg,
+        "ecg_flags": ecg_flags,
+        "ecg_risk_delta": ecg_risk_delta,
+        "model_version": serving.version,
+    }
+
+    if defer_explanations:
+        return {
+            **scored,
+            **PENDING_EXPLANATIONS,
+            "explanation_status": "pending",
+            "cache_key": key,
+            "serving": serving,
+        }
+
+    scored.update(explain_visit(input_data, bmi, serving, X_scaled))
+    scored["explanation_status"] = "ready"
+
+    prediction_cache.set(key, scored)
+    return scored
+
+
+# ===============================
+# DEFERRED EXPLANATIONS
+# ===============================
+explanation_worker = ThreadPoolExecutor(
+    max_workers=EXPLANATION_WORKERS,
+    thread_name_prefix="explanations"
+)
+
+# (hospital_id, patient_id, record_id) -> explanation blocks
+explanation_cache = TTLCache(maxsize=2048, ttl=3600)
+
+# Deferred previews (save: false): preview_id -> (hospital_id, cache key).
+# The worker fills prediction_cache; clients poll it, nothing is rescored.
+preview_keys = TTLCache(maxsize=2048, ttl=PREDICTION_CACHE_TTL_SECONDS)
+
+
+def complete_explanations(scored, input_data, record_ref=None, memo_key=None):
+    """
+    Background job: compute the deferred blocks, patch the saved record
+    and memoize them (a preview only warms prediction_cache).
+    """
+    try:
+        explained = explain_visit(input_data, scored["bmi"], scored["serving"])
+
+        full = {
+            k: v for k, v in scored.items()
+            if k not in ("cache_key", "serving")
+        }
+        full.update(explained)
+        full["explanation_status"] = "ready"
+        prediction_cache.set(scored["cache_key"], full)
+
+        if record_ref is not None:
+            record_ref.update({**explained, "explanation_status": "ready"})
+            explanation_cache.set(memo_key, {**explained, "explanation_status": "ready"})
+
+    except Exception as e:
+        print("EXPLANATION WORKER ERROR:", e)
+
+
+def run_in_background(fn, *args):
+    def job():
+        try:
+            fn(*args)
+        except Exception as e:
+            print("BACKGROUND JOB ERROR:", e)
+
+    explanation_worker.submit(job)
+
+
 @predict_bp.route("/predict", methods=["POST"])
 def predict():
     try:
         data = request.get_json()
         save_flag = bool(data.get("save", True))
+        defer_flag = bool(data.get("defer_explanations", False))
 
       
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
-
-        id_token = auth_header.replace("Bearer ", "").strip()
-        _, hospital_email = verify_hospital_token(id_token)
-        hospital_id = get_hospital_id_by_email(hospital_email)
+        hospital_uid, hospital_email = current_hospital()
+        hospital_id = get_hospital_id(hospital_uid, hospital_email)
 
         
         if "input" not in data:
@@ -164,34 +391,21 @@ def predict():
 
         validate_input(input_data)
 
-    
-        ecg = None
-        ecg_flags = {"status": "not_recorded", "flags": []}
-        ecg_risk_delta = {"delta": 0.0, "reasons": []}
-
-        if ecg_raw:
-            ecg = {k: v for k, v in ecg_raw.items() if v is not None}
-            if ecg:
-                validate_ecg(ecg)
-                ecg_flags = generate_ecg_flags(ecg, input_data.get("gender"))
-                ecg_risk_delta = calculate_ecg_risk_delta(ecg)
-
-        from joblib import load
-        
-        
-        X_raw, bmi = build_model_input(input_data)
-        X_scaled = scaler.transform(X_raw)
-        
-        probability = model.predict_proba(X_scaled)[0][1]
-        risk_level = map_risk(probability)
+        scored = score_visit(input_data, ecg_raw, defer_explanations=defer_flag)
+        deferred = scored["explanation_status"] == "pending"
+
+        probability = scored["probability"]
+        risk_level = scored["risk_level"]
+        confidence = scored["confidence"]
+        bmi = scored["bmi"]
+        top_factors = scored["top_factors"]
+        symptom_insights = scored["symptom_insights"]
+        explanation = scored["explanation"]
+        what_if = scored["what_if"]
+        ecg = scored["ecg"]
+        ecg_flags = scored["ecg_flags"]
+        ecg_risk_delta = scored["ecg_risk_delta"]
 
-    
-        top_factors = build_patient_risk_factors(input_data, bmi)
-        symptom_insights = explain_symptoms(input_data)
-        explanation = generate_explanation(input_data, bmi)
-        what_if = what_if_analysis(model, input_data)
-        confidence = prediction_confidence(probability)
-       
         patient_id = data.get("patient_id")
         if not patient_id:
             raise ValueError("patient_id is required")
@@ -213,100 +427,70 @@ def predict():
             patient_update["cardio_confirmed"] = True
             patient_update["cardio_confirmed_at"] = firestore.SERVER_TIMESTAMP
             patient_update["confirmed_by"] = confirmed_by or "doctor"
-
-        patient_ref.set(patient_update, merge=True)
+            patient_update["summary"] = {"cardiac_arrest": 1}
 
       
-        record = {
-            "created_at": firestore.SERVER_TIMESTAMP,
-
-            "input": {
-                "age": input_data["age"],
-                "gender": input_data["gender"],
-                "height": input_data["height"],
-                "weight": input_data["weight"],
-                "ap_hi": input_data["ap_hi"],
-                "ap_lo": input_data["ap_lo"],
-                "cholesterol": input_data["cholesterol"],
-                "gluc": input_data["gluc"],
-                "smoke": input_data["smoke"],
-                "alco": input_data["alco"],
-                "active": input_data["active"],
-                "chest_pain": input_data.get("chest_pain"),
-                "nausea": input_data.get("nausea"),
-                "palpitations": input_data.get("palpitations"),
-                "dizziness": input_data.get("dizziness"),
-            },
-
-            "derived": {
-                "bmi": bmi,
-                "ecg_risk_delta": ecg_risk_delta
-            },
-
-            "prediction": {
-                "probability": round(float(probability), 3),
-                "risk_level": risk_level,
-                "confidence": confidence,
-            },
-            "risk_level": risk_level,
-            "probability": round(float(probability), 3),
-            "confidence": confidence,
-
-            "symptom_insights": symptom_insights,
-            "top_factors": top_factors,
-            "what_if": what_if,
-
-            "ecg": ecg,
-            "ecg_flags": ecg_flags,
-
-            "doctor_notes": (
-                {
-                    "text": doctor_note_text.strip(),
-                    "created_at": firestore.SERVER_TIMESTAMP,
-                    "locked": True
-                }
-                if doctor_note_text
-                else None
-            ),
-
-            
-            "outcome": {
-                "cardiac_arrest": cardiac_arrest,
-                "confirmed_by": confirmed_by,
-                "confirmed_at": firestore.SERVER_TIMESTAMP if cardiac_arrest == 1 else None
-            }
-        }
+        record = build_record(
+            input_data, bmi, probability, risk_level, confidence,
+            symptom_insights, top_factors, what_if,
+            ecg, ecg_flags, ecg_risk_delta,
+            doctor_note_text=doctor_note_text,
+            cardiac_arrest=cardiac_arrest,
+            confirmed_by=confirmed_by,
+            model_version=scored["model_version"],
+            feature_contributions=scored["feature_contributions"],
+            explanation=explanation,
+            explanation_status=scored["explanation_status"]
+        )
 
         validate_record_schema(record)
+
+        record_id = None
+        record_ref = None
         if save_flag:
-            patient_ref.collection("records").add(record)
+            # Record + patient.summary in one transaction
+            record_ref = patient_ref.collection("records").document()
+            save_visit(db, patient_ref, record_ref, record, patient_update)
+            record_id = record_ref.id
+        else:
+            patient_ref.set(patient_update, merge=True)
+
+        preview_id = None
+        if deferred and not save_flag:
+            preview_id = secrets.token_urlsafe(16)
+            preview_keys.set(preview_id, (hospital_id, scored["cache_key"]))
+
+        if deferred:
+            run_in_background(
+                complete_explanations,
+                scored,
+                input_data,
+                record_ref,
+                (hospital_id, patient_id, record_id)
+            )
 
          
         if save_flag and cardiac_arrest == 1:
-            for rec in patient_ref.collection("records").stream():
-                rec.reference.set(
-                    {
-                        "outcome": {
-                            "cardiac_arrest": 1,
-                            "confirmed_by": confirmed_by or "doctor",
-                            "confirmed_at": firestore.SERVER_TIMESTAMP
-                        }
-                    },
-                    merge=True
-                )
+            # Batched, retried and off the request path
+            schedule_cardiac_arrest_propagation(db, patient_ref, confirmed_by)
 
         
         return jsonify({
+            "record_id": record_id,
+            "preview_id": preview_id,
             "probability": round(float(probability), 3),
             "risk_level": risk_level,
             "confidence": confidence,
             "bmi": bmi,
             "top_factors": top_factors,
+            "feature_contributions": scored["feature_contributions"],
             "symptom_insights": symptom_insights,
             "explanation": explanation,
             "what_if": what_if,
+            "explanation_status": scored["explanation_status"],
             "ecg_flags": ecg_flags,
             "ecg_risk_delta": ecg_risk_delta,
+            "model_version": scored["model_version"],
             "disclaimer": "This is not a medical diagnosis",
         })
     
@@ -319,4 +503,446 @@ def predict():
     except Exception as e:
         print("PREDICT ERROR:", e)
         return jsonify({"error": "Internal server error"}), 500
- 
\ No newline at end of file
+
+
+@predict_bp.route(
+    "/patients/<patient_id>/records/<record_id>/explanations",
+    methods=["GET"]
+)
+def record_explanations(patient_id, record_id):
+    """
+    Explanation blocks of a saved record.
+
+    Deferred records ("explanation_status": "pending") are computed on the
+    first call if the background worker has not patched them yet, with
+    the model version that scored them ("stale" if it is gone).
+    """
+    try:
+        hospital_uid, hospital_email = current_hospital()
+        hospital_id = get_hospital_id(hospital_uid, hospital_email)
+
+        memo_key = (hospital_id, patient_id, record_id)
+        explained = explanation_cache.get(memo_key)
+
+        if explained is None:
+            record_ref = (
+                db.collection("hospitals")
+                .document(hospital_id)
+                .collection("patients")
+                .document(patient_id)
+                .collection("records")
+                .document(record_id)
+            )
+
+            record_doc = record_ref.get()
+            if not record_doc.exists:
+                raise ValueError("Record not found")
+
+            record = record_doc.to_dict()
+            # Optional symptoms are stored as None when not asked
+            input_data = {
+                k: v for k, v in (record.get("input") or {}).items()
+                if v is not None
+            }
+            bmi = (record.get("derived") or {}).get("bmi")
+
+            status = record.get("explanation_status") or "ready"
+
+            if status == "pending":
+                # Explain with the model that produced the stored probability
+                serving = model_for_version(record.get("model_version"))
+                if serving is None:
+                    status = "stale"
+                    record_ref.update({"explanation_status": status})
+                else:
+                    explained = explain_visit(input_data, bmi, serving)
+                    record_ref.update({**explained, "explanation_status": "ready"})
+                    status = "ready"
+
+            if status == "stale":
+                explained = {**PENDING_EXPLANATIONS}
+            elif explained is None:
+                explained = {field: record.get(field) for field in EXPLANATION_FIELDS}
+                if explained["explanation"] is None:
+                    # Records saved before explanations were stored
+                    explained["explanation"] = generate_explanation(input_data, bmi)
+
+            explained = {**explained, "explanation_status": status}
+            explanation_cache.set(memo_key, explained)
+
+        return jsonify({
+            "record_id": record_id,
+            **explained
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("RECORD EXPLANATIONS ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@predict_bp.route("/predict/preview/<preview_id>/explanations", methods=["GET"])
+def preview_explanations(preview_id):
+    """
+    Explanation blocks of a deferred preview once the background worker
+    has stored them; "explanation_status": "pending" until then.
+    """
+    try:
+        hospital_uid, hospital_email = current_hospital()
+        hospital_id = get_hospital_id(hospital_uid, hospital_email)
+
+        entry = preview_keys.get(preview_id)
+        if entry is None or entry[0] != hospital_id:
+            return jsonify({"error": "Preview expired"}), 404
+
+        full = prediction_cache.get(entry[1])
+        if full is None or full.get("explanation_status") != "ready":
+            return jsonify({
+                "preview_id": preview_id,
+                "explanation_status": "pending"
+            })
+
+        return jsonify({
+            "preview_id": preview_id,
+            "explanation_status": "ready",
+            **{field: full.get(field) for field in EXPLANATION_FIELDS}
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("PREVIEW EXPLANATIONS ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+MAX_BATCH_ITEMS = 500
+
+# Per-patient save transactions of one /predict/batch call run side by side
+batch_saver = ThreadPoolExecutor(
+    max_workers=BATCH_SAVE_WORKERS,
+    thread_name_prefix="batch-saves"
+)
+
+
+@predict_bp.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Scores many visits in one call (screening camps).
+
+    Body:
+    {
+        "items": [{"patient_id": ..., "input": {...}, "ecg": {...}, "doctor_notes": {...}}, ...],
+        "save": false
+    }
+
+    Every item is validated on its own; invalid items are reported in
+    "errors" and the rest are stacked into one matrix so the scaler and
+    the forest run exactly once for the whole batch.
+    """
+    try:
+        data = request.get_json() or {}
+        save_flag = bool(data.get("save", False))
+
+        hospital_uid, hospital_email = current_hospital()
+        hospital_id = get_hospital_id(hospital_uid, hospital_email)
+
+        items = data.get("items")
+        if not isinstance(items, list) or not items:
+            raise ValueError("items must be a non-empty list")
+
+        if len(items) > MAX_BATCH_ITEMS:
+            raise ValueError(f"At most {MAX_BATCH_ITEMS} items per batch")
+
+        # -------------------------
+        # VALIDATE + ENCODE
+        # -------------------------
+        rows = []
+        errors = []
+
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict) or "input" not in item:
+                    raise ValueError("Missing input data")
+
+                if save_flag and not item.get("patient_id"):
+                    raise ValueError("patient_id is required")
+
+                input_data = item["input"]
+                validate_input(input_data)
+
+                ecg, ecg_flags, ecg_risk_delta = prepare_ecg(
+                    item.get("ecg"), input_data.get("gender")
+                )
+
+                rows.append({
+                    "index": index,
+                    "item": item,
+                    "input": input_data,
+                    "ecg": ecg,
+                    "ecg_flags": ecg_flags,
+                    "ecg_risk_delta": ecg_risk_delta,
+                })
+
+            except (ValueError, TypeError, KeyError) as e:
+                errors.append({"index": index, "error": str(e)})
+
+        # -------------------------
+        # SCORE (one scaler + forest pass)
+        # -------------------------
+        serving = current_model()
+
+        probabilities = []
+        if rows:
+            # One encoder pass for the whole batch
+            X_raw, bmis = encode_records([row["input"] for row in rows])
+            for row, bmi in zip(rows, bmis):
+                row["bmi"] = round(float(bmi), 2)
+
+            X_scaled = serving.scaler.transform(X_raw)
+            probabilities = serving.model.predict_proba(X_scaled)[:, 1]
+            contributions = get_feature_contributions(
+                serving.model, X_scaled, FEATURE_ORDER
+            )
+            for row, row_contributions in zip(rows, contributions):
+                row["feature_contributions"] = row_contributions
+
+            # Every scenario of every row in one more scaler + forest pass
+            what_ifs = what_if_batch(
+                serving.model,
+                [row["input"] for row in rows],
+                probabilities,
+                serving.scaler
+            )
+            for row, what_if in zip(rows, what_ifs):
+                row["what_if"] = what_if
+
+        results = []
+        for row, probability in zip(rows, probabilities):
+            input_data = row["input"]
+            bmi = row["bmi"]
+
+            row["probability"] = probability
+            row["risk_level"] = map_risk(probability)
+            row["confidence"] = prediction_confidence(probability)
+            row["top_factors"] = build_patient_risk_factors(input_data, bmi)
+            row["symptom_insights"] = explain_symptoms(input_data)
+            row["explanation"] = generate_explanation(input_data, bmi)
+
+            results.append({
+                "index": row["index"],
+                "patient_id": row["item"].get("patient_id"),
+                "probability": round(float(probability), 3),
+                "risk_level": row["risk_level"],
+                "confidence": row["confidence"],
+                "bmi": bmi,
+                "top_factors": row["top_factors"],
+                "feature_contributions": row["feature_contributions"],
+                "symptom_insights": row["symptom_insights"],
+                "explanation": row["explanation"],
+                "what_if": row["what_if"],
+                "ecg_flags": row["ecg_flags"],
+                "ecg_risk_delta": row["ecg_risk_delta"],
+            })
+
+        # -------------------------
+        # SAVE (one transaction per patient)
+        # -------------------------
+        saved = 0
+        if save_flag and rows:
+            patients_ref = (
+                db.collection("hospitals")
+                .document(hospital_id)
+                .collection("patients")
+            )
+
+            rows_by_patient = {}
+            for row, result in zip(rows, results):
+                input_data = row["input"]
+                item = row["item"]
+
+                record = build_record(
+                    input_data, row["bmi"], row["probability"],
+                    row["risk_level"], row["confidence"],
+                    row["symptom_insights"], row["top_factors"], row["what_if"],
+                    row["ecg"], row["ecg_flags"], row["ecg_risk_delta"],
+                    doctor_note_text=(item.get("doctor_notes") or {}).get("text"),
+                    model_version=serving.version,
+                    feature_contributions=row["feature_contributions"],
+                    explanation=row["explanation"]
+                )
+                validate_record_schema(record)
+
+                result["saved"] = False
+                rows_by_patient.setdefault(item["patient_id"], []).append(
+                    (row, result, record)
+                )
+
+            # One transaction per patient, BATCH_SAVE_WORKERS at a time
+            futures = {
+                patient_id: batch_saver.submit(
+                    save_visits,
+                    db,
+                    patients_ref.document(patient_id),
+                    [record for _, _, record in patient_rows],
+                    {
+                        "gender": patient_rows[-1][0]["input"].get("gender"),
+                        "updated_at": firestore.SERVER_TIMESTAMP,
+                    }
+                )
+                for patient_id, patient_rows in rows_by_patient.items()
+            }
+
+            # A failed patient is reported per row; the others still save
+            for patient_id, patient_rows in rows_by_patient.items():
+                try:
+                    futures[patient_id].result()
+                except Exception as e:
+                    print("PREDICT BATCH SAVE ERROR:", patient_id, e)
+                    message = str(e) if isinstance(e, ValueError) else "Could not save"
+                    for row, _, _ in patient_rows:
+                        errors.append({"index": row["index"], "error": message})
+                    continue
+
+                for _, result, _ in patient_rows:
+                    result["saved"] = True
+                saved += len(patient_rows)
+
+        return jsonify({
+            "count": len(results),
+            "saved": saved,
+            "results": results,
+            "errors": errors,
+            "model_version": serving.version,
+            "disclaimer": "This is not a medical diagnosis",
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("PREDICT BATCH ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@predict_bp.route("/predict/sensitivity", methods=["POST"])
+def predict_sensitivity():
+    """
+    Risk curves for one patient while one or more vitals sweep a range.
+
+    Body:
+        {
+          "input": {...},
+          "variables": [
+            {"field": "ap_hi", "start": 100, "stop": 200, "step": 5},
+            {"field": "smoke", "values": [0, 1]}
+          ]
+        }
+    """
+    try:
+        current_hospital()
+
+        payload = request.get_json()
+        if not payload:
+            raise ValueError("Missing JSON body")
+
+        input_data = payload.get("input")
+        if not input_data:
+            raise ValueError("Missing input data")
+
+        validate_input(input_data)
+
+        # Whole grid is one matrix: score it directly, not through the batcher
+        serving = current_model()
+        curves = sensitivity_analysis(
+            serving.model,
+            serving.scaler,
+            input_data,
+            payload.get("variables") or []
+        )
+
+        return jsonify({
+            **curves,
+            "model_version": serving.version
+        })
+
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("SENSITIVITY ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@predict_bp.route("/predict/counterfactual", methods=["POST"])
+def predict_counterfactual():
+    """
+    Smallest actionable change (BP, weight, smoking, alcohol, activity)
+    that brings the patient down to Low risk, within a time budget.
+    """
+    try:
+        current_hospital()
+
+        payload = request.get_json()
+        if not payload or "input" not in payload:
+            raise ValueError("Missing input data")
+
+        input_data = payload["input"]
+        validate_input(input_data)
+
+        # Candidate populations are whole matrices: score them directly
+        serving = current_model()
+        result = counterfactual_search(
+            serving.model,
+            serving.scaler,
+            input_data,
+            COUNTERFACTUAL_BUDGET_MS
+        )
+
+        return jsonify({
+            **result,
+            "model_version": serving.version,
+            "disclaimer": "This is not a medical diagnosis"
+        })
+
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("COUNTERFACTUAL ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@predict_bp.route("/predict/cache/stats", methods=["GET"])
+def prediction_cache_stats():
+    try:
+        current_hospital()
+
+        return jsonify({
+            "model_version": current_model().version,
+            **prediction_cache.stats()
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("CACHE STATS ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@predict_bp.route("/predict/scheduler/stats", methods=["GET"])
+def inference_scheduler_stats():
+    try:
+        current_hospital()
+
+        return jsonify(inference.stats())
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print("SCHEDULER STATS ERROR:", e)
+        return jsonify({"error": "Internal server error"}), 500
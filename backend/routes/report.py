@@ -1,50 +1,24 @@
-from flask import Blueprint, request, send_file
+from flask import Blueprint, g, send_file
 from firebase import db
-from utils.auth import verify_hospital_token
-from utils.pdf_generator import generate_patient_report
+from utils.auth import current_hospital
+from utils.report_data import load_report_data
 
 report_bp = Blueprint("report", __name__)
 
 
 @report_bp.route("/patients/<patient_id>/report/pdf", methods=["GET"])
 def patient_pdf_report(patient_id):
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
+    if g.get("id_token") is None:
         return {"error": "Unauthorized"}, 401
 
-    id_token = auth_header.replace("Bearer ", "")
-    hospital_id, _ = verify_hospital_token(id_token)
+    hospital_id, _ = current_hospital()
 
-    hospital = db.collection("hospitals").document(hospital_id).get().to_dict()
-
-    patient_ref = (
-        db.collection("hospitals")
-        .document(hospital_id)
-        .collection("patients")
-        .document(patient_id)
-    )
-
-    patient = patient_ref.get().to_dict()
+    hospital, patient, records = load_report_data(db, hospital_id, patient_id)
     if not patient:
         return {"error": "Patient not found"}, 404
 
-    patient["patient_id"] = patient_id
-
-    records = []
-    for r in patient_ref.collection("records").order_by("created_at").stream():
-        d = r.to_dict() or {}
-
-        #  SAFE DOCTOR NOTE HANDLING
-        doctor_notes = d.get("doctor_notes") or {}
-
-        records.append({
-            "created_at": d.get("created_at"),
-            "prediction": d.get("prediction", {}),
-            "input": d.get("input", {}),
-            "derived": d.get("derived", {}),
-            "doctor_note": doctor_notes.get("text"),
-            "ecg_flags": d.get("ecg_flags"),
-        })
+    # reportlab is only loaded once a report is actually requested
+    from utils.pdf_generator import generate_patient_report
 
     pdf = generate_patient_report(hospital, patient, records)
 
@@ -1,6 +1,15 @@
 from flask import Blueprint, request, jsonify
 from firebase import db
-from utils.auth import verify_hospital_token
+from firebase_admin import firestore
+from utils.auth import current_hospital
+from utils.hospitals import get_hospital_id
+from utils.health_score import calculate_health_score
+from utils.patient_summary import (
+    is_complete_summary,
+    record_probability,
+    record_risk_level,
+    summary_view,
+)
 
 timeline_bp = Blueprint("timeline", __name__)
 
@@ -24,47 +33,138 @@ def serialize_timestamp(ts):
 
 
 
-def calculate_health_score(probability, trend_status):
-    if probability is None:
+# Timeline block -> record fields it is built from (Firestore select() paths)
+TIMELINE_BLOCKS = {
+    "risk": ["probability", "risk_level", "prediction"],
+    "prediction": ["probability", "risk_level", "prediction"],
+    "vitals": ["input.ap_hi", "input.ap_lo", "derived.bmi", "input.weight", "input.height"],
+    "ecg_risk_delta": ["derived.ecg_risk_delta"],
+    "doctor_notes": ["doctor_notes"],
+    "lifestyle": ["input.smoke", "input.alco", "input.active"],
+    "symptoms": ["input.chest_pain", "input.nausea", "input.palpitations", "input.dizziness"],
+    "ecg": ["ecg"],
+    "symptom_insights": ["symptom_insights"],
+    "explanation": ["explanation"],
+    "what_if": ["what_if"],
+    "top_factors": ["top_factors"],
+    "feature_contributions": ["feature_contributions"],
+}
+
+# Always read: ordering, dates and the summary (trend / health score)
+BASE_RECORD_FIELDS = ["created_at", "probability", "risk_level", "prediction"]
+
+MAX_TIMELINE_LIMIT = 500
+
+
+
+def parse_timeline_fields(raw):
+    """
+    ?fields=risk,vitals -> list of blocks (None = every block).
+    """
+    if not raw:
         return None
 
-    score = 100 - int(round(probability * 100))
+    blocks = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [b for b in blocks if b not in TIMELINE_BLOCKS]
+    if unknown:
+        raise ValueError(f"Unknown timeline fields: {', '.join(unknown)}")
 
-    if trend_status == "improving":
-        score += 5
-    elif trend_status == "worsening":
-        score -= 5
+    return blocks
 
-    return max(0, min(100, score))
 
+def parse_timeline_limit(raw):
+    if raw is None:
+        return None
 
+    limit = int(raw)
+    if not (1 <= limit <= MAX_TIMELINE_LIMIT):
+        raise ValueError(f"limit must be between 1 and {MAX_TIMELINE_LIMIT}")
 
-def get_hospital_id_by_email(email: str) -> str:
-    hospitals = (
-        db.collection("hospitals")
-        .where("email", "==", email)
-        .limit(1)
-        .stream()
-    )
+    return limit
 
-    for hospital in hospitals:
-        return hospital.id
 
-    raise ValueError("Hospital not registered in Firestore")
+def build_timeline_entry(record, data, blocks=None):
+    """
+    One timeline item; only `blocks` are included (None = all).
+    """
+    created_at = data.get("created_at")
+    if created_at is None:
+        created_at = record.create_time  # 🔥 GUARANTEED FALLBACK
+
+    prob = record_probability(data)
+    inputs = data.get("input", {})
+    derived = data.get("derived", {})
+
+    builders = {
+        "risk": lambda: {
+            "probability": prob,
+            "risk_level": record_risk_level(data),
+            "confidence": (data.get("prediction") or {}).get("confidence")
+        },
+        "prediction": lambda: {
+            "probability": prob or 0,
+            "risk_level": record_risk_level(data) or "—",
+            "confidence": (data.get("prediction") or {}).get("confidence")
+        },
+        "vitals": lambda: {
+            "ap_hi": inputs.get("ap_hi"),
+            "ap_lo": inputs.get("ap_lo"),
+            "bmi": derived.get("bmi"),
+            "weight": inputs.get("weight"),
+            "height": inputs.get("height")
+        },
+        "ecg_risk_delta": lambda: derived.get("ecg_risk_delta"),
+        "doctor_notes": lambda: data.get("doctor_notes"),
+        "lifestyle": lambda: {
+            "smoke": inputs.get("smoke"),
+            "alco": inputs.get("alco"),
+            "active": inputs.get("active")
+        },
+        "symptoms": lambda: {
+            "chest_pain": inputs.get("chest_pain"),
+            "nausea": inputs.get("nausea"),
+            "palpitations": inputs.get("palpitations"),
+            "dizziness": inputs.get("dizziness")
+        },
+        "ecg": lambda: data.get("ecg"),
+        "symptom_insights": lambda: data.get("symptom_insights", []),
+        "explanation": lambda: data.get("explanation"),
+        "what_if": lambda: data.get("what_if", []),
+        "top_factors": lambda: data.get("top_factors", []),
+        "feature_contributions": lambda: data.get("feature_contributions", []),
+    }
+
+    entry = {
+        "record_id": record.id,
+        "date": serialize_timestamp(created_at),
+    }
+    for block in (blocks or TIMELINE_BLOCKS):
+        entry[block] = builders[block]()
+
+    return entry
 
 
 
 @timeline_bp.route("/patients/<patient_id>/timeline", methods=["GET"])
 def patient_timeline(patient_id):
+    """
+    Query params (all optional):
+        fields  comma separated blocks, e.g. fields=risk,vitals
+        limit   page size (1..MAX_TIMELINE_LIMIT); no limit = whole history
+        cursor  next_cursor of the previous page
+        order   asc (default, oldest first) or desc
+    """
     try:
        
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise ValueError("Authorization token missing")
+        hospital_uid, hospital_email = current_hospital()
+        hospital_id = get_hospital_id(hospital_uid, hospital_email)
 
-        id_token = auth_header.replace("Bearer ", "").strip()
-        _, hospital_email = verify_hospital_token(id_token)
-        hospital_id = get_hospital_id_by_email(hospital_email)
+        blocks = parse_timeline_fields(request.args.get("fields"))
+        limit = parse_timeline_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        order = request.args.get("order", "asc")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
 
       
         patient_ref = (
@@ -81,90 +181,59 @@ def patient_timeline(patient_id):
         patient_data = patient_doc.to_dict()
 
       
-        records_ref = (
-            patient_ref
-            .collection("records")
-            .order_by("created_at")
+        records_col = patient_ref.collection("records")
+        records_ref = records_col.order_by(
+            "created_at",
+            direction=(
+                firestore.Query.DESCENDING if order == "desc"
+                else firestore.Query.ASCENDING
+            )
         )
 
+        # Only the fields the requested blocks need
+        if blocks is not None:
+            field_paths = list(BASE_RECORD_FIELDS)
+            for block in blocks:
+                for path in TIMELINE_BLOCKS[block]:
+                    if path not in field_paths:
+                        field_paths.append(path)
+            records_ref = records_ref.select(field_paths)
+
+        if cursor:
+            cursor_doc = records_col.document(cursor).get(field_paths=["created_at"])
+            if not cursor_doc.exists:
+                raise ValueError("Invalid cursor")
+            records_ref = records_ref.start_after(cursor_doc)
+
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            records_ref = records_ref.limit(limit + 1)
+
+        records = list(records_ref.stream())
+
+        has_more = limit is not None and len(records) > limit
+        if has_more:
+            records = records[:limit]
+
         timeline = []
         probabilities = []
 
-        for record in records_ref.stream():
+        for record in records:
             data = record.to_dict() or {}
 
-            created_at = data.get("created_at")
-            if created_at is None:
-                created_at = record.create_time  # 🔥 GUARANTEED FALLBACK
-
-        
-            prob = (
-                data.get("probability")
-                or data.get("prediction", {}).get("probability")
-            )
-
+            prob = record_probability(data)
             if isinstance(prob, (int, float)):
                 probabilities.append(prob)
 
-            timeline.append({
-                "record_id": record.id,
-
-                #  ALWAYS PRESENT NOW
-                "date": serialize_timestamp(created_at),
-
-                "risk": {
-                    "probability": prob,
-                    "risk_level": (
-                        data.get("risk_level")
-                        or data.get("prediction", {}).get("risk_level")
-                    ),
-                    "confidence": data.get("prediction", {}).get("confidence")
-                },
-
-                "prediction": {
-                "probability": prob or 0,
-                "risk_level": (
-                    data.get("risk_level")
-                    or data.get("prediction", {}).get("risk_level")
-                    or "—"
-                ),
-                "confidence": data.get("prediction", {}).get("confidence")
-            },
+            timeline.append(build_timeline_entry(record, data, blocks))
 
-                "vitals": {
-                    "ap_hi": data.get("input", {}).get("ap_hi"),
-                    "ap_lo": data.get("input", {}).get("ap_lo"),
-                    "bmi": data.get("derived", {}).get("bmi"),
-                    "weight": data.get("input", {}).get("weight"),
-                    "height": data.get("input", {}).get("height")
-                },
-
-                "ecg_risk_delta": data.get("derived", {}).get("ecg_risk_delta"),
-                "doctor_notes": data.get("doctor_notes"),
-
-                
-                "lifestyle": {
-                    "smoke": data.get("input", {}).get("smoke"),
-                    "alco": data.get("input", {}).get("alco"),
-                    "active": data.get("input", {}).get("active")
-                },
-
-                "symptoms": {
-                    "chest_pain": data.get("input", {}).get("chest_pain"),
-                    "nausea": data.get("input", {}).get("nausea"),
-                    "palpitations": data.get("input", {}).get("palpitations"),
-                    "dizziness": data.get("input", {}).get("dizziness")
-                },
-
-                
-                "ecg": data.get("ecg"),
-
-              
-                "symptom_insights": data.get("symptom_insights", []),
-                "explanation": data.get("explanation"),
-                "what_if": data.get("what_if", []),
-                "top_factors": data.get("top_factors", [])
-            })
+        # Trend is always computed oldest -> newest
+        if order == "desc":
+            probabilities.reverse()
+        latest_risk_level = None
+        if records:
+            newest = records[0] if order == "desc" else records[-1]
+            latest_risk_level = record_risk_level(newest.to_dict() or {})
 
         
         trend = {"status": "insufficient_data", "delta": None}
@@ -179,10 +248,21 @@ def patient_timeline(patient_id):
             )
 
         latest_probability = probabilities[-1] if probabilities else None
-        health_score = calculate_health_score(
-            probability=latest_probability,
-            trend_status=trend["status"]
-        )
+        health_score = calculate_health_score(latest_probability, trend["status"])
+
+        # Maintained on write (utils/patient_summary.py); covers the whole
+        # history even when only one page of records was read
+        stored_summary = patient_data.get("summary")
+        if is_complete_summary(stored_summary):
+            summary = summary_view(stored_summary)
+        else:
+            summary = {
+                "records_count": len(timeline),
+                "latest_probability": latest_probability,
+                "latest_risk_level": latest_risk_level,
+                "trend": trend,
+                "health_score": health_score
+            }
 
        
         return jsonify({
@@ -200,17 +280,14 @@ def patient_timeline(patient_id):
                 "guardian_email": patient_data.get("guardian_email"),
                 "outcome": patient_data.get("outcome", {})
             },
-            "summary": {
-                "records_count": len(timeline),
-                "latest_probability": latest_probability,
-                "latest_risk_level": (
-                    timeline[-1]["risk"]["risk_level"]
-                    if timeline else None
-                ),
-                "trend": trend,
-                "health_score": health_score
-            },
-            "timeline": timeline
+            "summary": summary,
+            "timeline": timeline,
+            "page": {
+                "limit": limit,
+                "order": order,
+                "has_more": has_more,
+                "next_cursor": timeline[-1]["record_id"] if has_more else None
+            }
         })
 
     except ValueError as e:
@@ -218,4 +295,4 @@ def patient_timeline(patient_id):
 
     except Exception as e:
         print("TIMELINE ERROR:", e)
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,72 @@
+import sys
+import os
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from firebase import db
+from utils.patient_index import patient_index_fields
+
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def backfill(hospital_id=None, dry_run=False):
+    """
+    Writes the derived search / list fields (utils/patient_index.py)
+    on every existing patient.
+    """
+    hospital_ids = (
+        [hospital_id] if hospital_id
+        else [h.id for h in db.collection("hospitals").select([]).stream()]
+    )
+
+    updated = 0
+
+    for hid in hospital_ids:
+        patients = (
+            db.collection("hospitals")
+            .document(hid)
+            .collection("patients")
+            .stream()
+        )
+
+        batch = db.batch()
+        pending = 0
+
+        for patient in patients:
+            d = patient.to_dict() or {}
+            if d.get("is_deleted") is True:
+                fields = patient_index_fields(None)
+            else:
+                fields = patient_index_fields(d.get("name"), d.get("primary_mobile_norm"))
+
+            if all(d.get(k) == v for k, v in fields.items()):
+                continue
+
+            updated += 1
+            if dry_run:
+                continue
+
+            batch.update(patient.reference, fields)
+            pending += 1
+
+            if pending == FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                batch = db.batch()
+                pending = 0
+
+        if pending:
+            batch.commit()
+
+    print(f"✅ {'Would update' if dry_run else 'Updated'} {updated} patients")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill derived patient index fields")
+    parser.add_argument("--hospital", help="Only this hospital id")
+    parser.add_argument("--dry-run", action="store_true", help="Count without writing")
+    args = parser.parse_args()
+
+    backfill(args.hospital, args.dry_run)
@@ -0,0 +1,71 @@
+import sys
+import os
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from firebase import db
+from utils.patient_summary import SUMMARY_RECORD_FIELDS, rebuild_summary, summary_view
+
+
+def backfill_patient(patient_ref, patient_data, dry_run=False):
+    records = (
+        patient_ref.collection("records")
+        .select(SUMMARY_RECORD_FIELDS)
+        .order_by("created_at")
+        .stream()
+    )
+
+    summary = rebuild_summary(
+        (record.get("created_at"), record.to_dict() or {})
+        for record in records
+    )
+
+    if (patient_data.get("outcome") or {}).get("cardiac_arrest") == 1:
+        summary["cardiac_arrest"] = 1
+
+    if not dry_run:
+        patient_ref.set({"summary": summary}, merge=True)
+
+    return summary
+
+
+def backfill(hospital_id=None, dry_run=False):
+    hospital_ids = (
+        [hospital_id] if hospital_id
+        else [h.id for h in db.collection("hospitals").select([]).stream()]
+    )
+
+    patients_done = 0
+
+    for hid in hospital_ids:
+        patients = (
+            db.collection("hospitals")
+            .document(hid)
+            .collection("patients")
+            .select(["outcome"])
+            .stream()
+        )
+
+        for patient in patients:
+            summary = backfill_patient(patient.reference, patient.to_dict() or {}, dry_run)
+            patients_done += 1
+
+            view = summary_view(summary)
+            print(
+                f"{hid}/{patient.id}: {view['records_count']} records, "
+                f"latest {view['latest_probability']} ({view['trend']['status']})"
+            )
+
+    print(f"✅ {'Checked' if dry_run else 'Backfilled'} {patients_done} patients")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild patient.summary from records")
+    parser.add_argument("--hospital", help="Only this hospital id")
+    parser.add_argument("--dry-run", action="store_true", help="Compute without writing")
+    args = parser.parse_args()
+
+    backfill(args.hospital, args.dry_run)
@@ -0,0 +1,73 @@
+import sys
+import os
+import time
+import threading
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import numpy as np
+
+from config import INFERENCE_BATCH_WINDOW_MS, INFERENCE_BATCH_MAX_ROWS
+from ml.batcher import InferenceBatcher
+from ml.predictor import load_model_and_scaler
+from bench_forest import random_raw_rows
+
+CONCURRENCY = [1, 8, 32]
+REQUESTS_PER_THREAD = 50
+
+
+def run(score, X, threads):
+    """
+    `threads` callers each score REQUESTS_PER_THREAD single rows.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(offset):
+        local = []
+        for i in range(REQUESTS_PER_THREAD):
+            row = X[(offset + i) % len(X)][np.newaxis, :]
+            start = time.perf_counter()
+            score(row)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=caller, args=(t * REQUESTS_PER_THREAD,)) for t in range(threads)]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), len(latencies) / elapsed
+
+
+def main():
+    model, scaler, version = load_model_and_scaler()
+    X = scaler.transform(random_raw_rows(4096, np.random.default_rng(7)))
+
+    batcher = InferenceBatcher(
+        model.predict_proba,
+        window_ms=INFERENCE_BATCH_WINDOW_MS,
+        max_batch=INFERENCE_BATCH_MAX_ROWS
+    )
+
+    print(f"Model {version}  window {INFERENCE_BATCH_WINDOW_MS} ms  max batch {INFERENCE_BATCH_MAX_ROWS}")
+    print(f"{'threads':>8} {'mode':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+
+    for threads in CONCURRENCY:
+        for mode, score in (("direct", model.predict_proba), ("batched", batcher.predict_proba)):
+            p50, p99, throughput = run(score, X, threads)
+            print(f"{threads:>8} {mode:>8} {p50:>9.2f} {p99:>9.2f} {throughput:>9.0f}")
+
+    print("Batcher:", batcher.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.duplicate_index import MAX_DUPLICATE_MATCHES, NameTrigramIndex
+
+# Synthetic hospital for GET /patients/duplicate-check: build the name
+# trigram index for N patients, then time lookups of misspelled names.
+
+FIRST_NAMES = [
+    "aarav", "aditi", "amit", "ananya", "arjun", "deepa", "divya", "farhan",
+    "gaurav", "isha", "karan", "kavya", "manish", "meera", "neha", "nikhil",
+    "pooja", "priya", "rahul", "ravi", "rohan", "sanjay", "shreya", "sneha",
+    "suresh", "tanvi", "varun", "vikram", "yash", "zoya",
+]
+
+LAST_NAMES = [
+    "agarwal", "bose", "chopra", "das", "desai", "gupta", "iyer", "jain",
+    "joshi", "kapoor", "khan", "kumar", "mehta", "menon", "mishra", "nair",
+    "patel", "pillai", "rao", "reddy", "saxena", "shah", "sharma", "singh",
+    "sinha", "verma",
+]
+
+
+def random_name(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    # A third token keeps the name space from collapsing to ~800 names
+    return f"{name} {rng.choice(LAST_NAMES)[:rng.randint(3, 6)]}{rng.randint(0, 99)}"
+
+
+def misspell(rng, name):
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    if chars[i] != " ":
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Duplicate-check index benchmark")
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    patients = [
+        (f"{i:012d}", random_name(rng), rng.randint(18, 90))
+        for i in range(args.patients)
+    ]
+
+    index = NameTrigramIndex()
+    start = time.perf_counter()
+    for patient_id, name, age in patients:
+        index.add(patient_id, name, age)
+    build_s = time.perf_counter() - start
+
+    print(f"Patients indexed   : {len(index)}")
+    print(f"Index build        : {build_s:.2f} s")
+    print(f"Posting lists      : {len(index.postings)}")
+
+    timings = []
+    found = 0
+    for _ in range(args.queries):
+        patient_id, name, age = rng.choice(patients)
+        query_age = age + rng.choice((-1, 0, 1))
+
+        start = time.perf_counter()
+        results = index.search(misspell(rng, name), query_age)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        found += any(p["patient_id"] == patient_id for _, p in results)
+
+    print(f"Queries            : {args.queries} (one typo, age +/- 1)")
+    print(f"Latency p50 / p95  : {percentile(timings, 50):.2f} / {percentile(timings, 95):.2f} ms")
+    print(f"Latency max        : {max(timings):.2f} ms")
+    print(f"Original in top {MAX_DUPLICATE_MATCHES}  : {found / args.queries:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import sys
+import os
+import time
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import joblib
+import numpy as np
+
+from config import MODEL_PATH, SCALER_PATH
+from ml.forest import FlatForest
+
+BATCH_SIZES = [1, 4, 64, 4096]
+REPEATS = 20
+
+
+def random_raw_rows(n, rng):
+    """
+    Synthetic visits inside the ranges accepted by validate_input.
+    """
+    height = rng.uniform(140, 200, n)
+    weight = rng.uniform(40, 140, n)
+    ap_lo = rng.integers(60, 110, n)
+
+    return np.column_stack([
+        rng.integers(25, 80, n),            # age_years
+        rng.integers(1, 3, n),              # gender
+        height,
+        weight,
+        weight / ((height / 100) ** 2),     # bmi
+        ap_lo + rng.integers(20, 70, n),    # ap_hi
+        ap_lo,
+        rng.integers(1, 4, n),              # cholesterol
+        rng.integers(1, 4, n),              # gluc
+        rng.integers(0, 2, n),              # smoke
+        rng.integers(0, 2, n),              # alco
+        rng.integers(0, 2, n),              # active
+        rng.integers(0, 4, n),              # chest_pain
+        rng.integers(0, 2, n),              # nausea
+        rng.integers(0, 2, n),              # palpitations
+        rng.integers(0, 3, n),              # dizziness
+    ]).astype(float)
+
+
+def timed(fn, X):
+    fn(X)  # warm-up
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(X)
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+
+    forest = FlatForest.from_sklearn(model)
+    rng = np.random.default_rng(42)
+
+    # Parity is checked against the sequential (n_jobs=1) copy held by the
+    # forest: the loaded model may sum its trees on several threads, in no
+    # fixed order, so its output can differ in the last bits run to run.
+    # The "sklearn ms" column still times the loaded model as configured.
+    reference = forest.estimator
+
+    print(f"Trees: {forest.n_estimators}  nodes: {forest.feature.size}  max depth: {forest.max_depth}")
+    print(f"{'rows':>6} {'sklearn ms':>12} {'flat ms':>10} {'auto ms':>10}")
+
+    for n in BATCH_SIZES:
+        X = scaler.transform(random_raw_rows(n, rng))
+
+        expected = reference.predict_proba(X)
+        if not np.array_equal(expected, forest.predict_proba_flat(X)):
+            print(f"❌ Flat traversal differs from sklearn for {n} rows")
+            sys.exit(1)
+        if not np.array_equal(expected, forest.predict_proba(X)):
+            print(f"❌ predict_proba differs from sklearn for {n} rows")
+            sys.exit(1)
+
+        print(
+            f"{n:>6} "
+            f"{timed(model.predict_proba, X):>12.3f} "
+            f"{timed(forest.predict_proba_flat, X):>10.3f} "
+            f"{timed(forest.predict_proba, X):>10.3f}"
+        )
+
+    print("✅ Flat forest is bit-identical to a sequential predict_proba")
+
+
+if __name__ == "__main__":
+    main()
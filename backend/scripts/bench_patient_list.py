@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from firebase import db
+from firebase_admin import firestore
+from routes.patients import PATIENT_LIST_FIELDS
+
+# Compares document reads / payload of the old full-collection listing
+# with the paginated + projected query behind GET /patients.
+
+
+def measure(label, fetch):
+    start = time.perf_counter()
+    docs = fetch()
+    elapsed = time.perf_counter() - start
+
+    payload = len(json.dumps([d.to_dict() for d in docs], default=str))
+    print(f"{label:<28} {len(docs):>8} reads {payload / 1024:>10.1f} KiB {elapsed * 1000:>9.1f} ms")
+    return len(docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Patient list read-count benchmark")
+    parser.add_argument("hospital_id")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    patients_col = (
+        db.collection("hospitals")
+        .document(args.hospital_id)
+        .collection("patients")
+    )
+
+    print(f"{'query':<28} {'docs':>14} {'payload':>14} {'time':>12}")
+
+    # Before: every patient, full documents
+    full = measure(
+        "full stream (old)",
+        lambda: list(
+            patients_col
+            .order_by("created_at", direction=firestore.Query.DESCENDING)
+            .stream()
+        )
+    )
+
+    # After: first pages of the default dashboard view
+    query = (
+        patients_col
+        .where("is_deleted", "==", False)
+        .order_by("created_at", direction=firestore.Query.DESCENDING)
+        .select(PATIENT_LIST_FIELDS)
+    )
+
+    paged = 0
+    cursor = None
+    for page in range(args.pages):
+        page_query = query.start_after(cursor) if cursor is not None else query
+        docs = []
+
+        def fetch():
+            docs.extend(page_query.limit(args.limit + 1).stream())
+            return docs
+
+        paged += measure(f"page {page + 1} (limit {args.limit})", fetch)
+        if len(docs) <= args.limit:
+            break
+        cursor = docs[args.limit - 1]
+
+    print(f"\nReads per dashboard load: {full} -> {min(full, args.limit + 1)}")
+    print(f"Reads for {args.pages} pages: {paged}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import sys
+import os
+import math
+import argparse
+import threading
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from utils.admin_stats import compute_admin_stats, get_admin_stats, invalidate_admin_stats
+
+# Runs /admin/stats against an in-memory Firestore stand-in that bills
+# reads like Firestore does: one per streamed document, one per 1000
+# index entries (min 1) for a count() aggregation. Exits non-zero when
+# the endpoint reads more than it should.
+
+
+class FakeAggregation:
+    def __init__(self, query):
+        self.query = query
+
+    def get(self):
+        matched = len(self.query.matching())
+        self.query.store.bill(max(1, math.ceil(matched / 1000)))
+        return [[type("AggregationResult", (), {"alias": "count", "value": matched})()]]
+
+
+class FakeQuery:
+    def __init__(self, store, collection, filters=()):
+        self.store = store
+        self.collection = collection
+        self.filters = filters
+
+    def where(self, field, op, value):
+        assert op == "==", op
+        return FakeQuery(self.store, self.collection, self.filters + ((field, value),))
+
+    def matching(self):
+        return [
+            d for d in self.store.data.get(self.collection, [])
+            if all(d.get(f) == v for f, v in self.filters)
+        ]
+
+    def stream(self):
+        docs = self.matching()
+        self.store.bill(len(docs))
+        return iter(docs)
+
+    def count(self, alias=None):
+        return FakeAggregation(self)
+
+
+class FakeFirestore:
+    def __init__(self, data):
+        self.data = data
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def bill(self, n):
+        with self._lock:
+            self.reads += n
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+
+def legacy_stats(db):
+    """
+    The previous implementation: stream and len() every document.
+    """
+    requests_col = db.collection("hospital_requests")
+    return {
+        "pending": len(list(requests_col.where("status", "==", "pending").stream())),
+        "approved": len(list(requests_col.where("status", "==", "approved").stream())),
+        "rejected": len(list(requests_col.where("status", "==", "rejected").stream())),
+        "hospitals": len(list(db.collection("hospitals").stream())),
+    }
+
+
+def measure(db, fn):
+    db.reads = 0
+    result = fn(db)
+    return result, db.reads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin stats read-count harness")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--hospitals", type=int, default=1500)
+    args = parser.parse_args()
+
+    statuses = ("pending", "approved", "rejected")
+    db = FakeFirestore({
+        "hospital_requests": [{"status": statuses[i % 3]} for i in range(args.requests)],
+        "hospitals": [{} for _ in range(args.hospitals)],
+    })
+
+    old, old_reads = measure(db, legacy_stats)
+    new, new_reads = measure(db, compute_admin_stats)
+
+    # count() is billed per 1000 index entries, min 1 per query
+    expected = sum(
+        max(1, math.ceil(n / 1000)) for n in old.values()
+    )
+
+    invalidate_admin_stats()
+    _, first_reads = measure(db, get_admin_stats)
+    _, cached_reads = measure(db, get_admin_stats)
+    invalidate_admin_stats()
+    _, after_invalidate_reads = measure(db, get_admin_stats)
+
+    print(f"Counts                  : {new}")
+    print(f"Reads, stream + len     : {old_reads}")
+    print(f"Reads, count() in pool  : {new_reads} (expected {expected})")
+    print(f"Reads, cached call      : {cached_reads}")
+
+    assert new == old, (new, old)
+    assert new_reads == expected, (new_reads, expected)
+    assert first_reads == expected, first_reads
+    assert cached_reads == 0, cached_reads
+    assert after_invalidate_reads == expected, after_invalidate_reads
+
+    print("✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import subprocess
+import time
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+# Import of the /predict path must stay under this budget ...
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+# ... and must not pull in report / email / training dependencies
+FORBIDDEN_MODULES = ["reportlab", "pandas", "smtplib", "sklearn", "scipy"]
+
+TARGET = "routes.predict"
+
+
+def main():
+    if not os.getenv("FIREBASE_KEY_JSON"):
+        print("❌ FIREBASE_KEY_JSON must be set (routes import firebase)")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    # "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative), name))
+
+    top_level = {name.strip().split(".")[0] for _, name in rows}
+    loaded = [m for m in FORBIDDEN_MODULES if m in top_level]
+
+    print(f"import {TARGET}: {elapsed:.2f} s (budget {IMPORT_BUDGET_SECONDS:.2f} s)")
+    print("Slowest imports:")
+    for cumulative, name in sorted(rows, reverse=True)[:10]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name.strip()}")
+
+    failed = False
+    if loaded:
+        print(f"❌ Eagerly imported: {', '.join(loaded)}")
+        failed = True
+    if elapsed > IMPORT_BUDGET_SECONDS:
+        print("❌ Import time over budget")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print("✅ /predict import path is lean")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys
+import os
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from config import MODEL_ARTIFACT_PATH
+from ml.registry import get_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a model artifact to the registry")
+    parser.add_argument("artifact", nargs="?", default=MODEL_ARTIFACT_PATH)
+    parser.add_argument("--version", help="defaults to the version in the artifact header")
+    parser.add_argument("--no-activate", action="store_true", help="upload without switching traffic")
+    args = parser.parse_args()
+
+    registry = get_registry()
+    if registry is None:
+        print("❌ Set MODEL_REGISTRY (\"bucket\" or \"local:/path\") first")
+        sys.exit(1)
+
+    version = registry.publish(args.artifact, version=args.version, activate=not args.no_activate)
+
+    print(f"✅ Published model version {version}")
+    if not args.no_activate:
+        print("Workers will switch on their next registry poll")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import argparse
+
+# ✅ Add backend to Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from firebase import db
+from utils.dashboard_rollup import read_rollup, rebuild_rollup, scan_rollup
+
+# Recomputes the /dashboard/analytics rollups from the patient documents
+# (one transaction per hospital, safe to run while the app is serving).
+# Until a hospital has been rebuilt its dashboard counts by scanning.
+# --check only compares the stored counters with a fresh scan.
+
+
+def diff_rollups(stored, fresh):
+    diffs = []
+    for key in ("total", "deleted"):
+        if stored[key] != fresh[key]:
+            diffs.append(f"{key}: stored {stored[key]}, actual {fresh[key]}")
+
+    days = set(stored["daily"]) | set(fresh["daily"])
+    for day in sorted(days):
+        a = stored["daily"].get(day, 0)
+        b = fresh["daily"].get(day, 0)
+        if a != b:
+            diffs.append(f"daily[{day}]: stored {a}, actual {b}")
+
+    return diffs
+
+
+def check(hospital_id):
+    fresh = scan_rollup(db, hospital_id)
+    stored = read_rollup(db, hospital_id)
+
+    if stored is None:
+        print(f"{hospital_id}: rollup never built ({fresh['total']} patients)")
+        return False
+
+    diffs = diff_rollups(stored, fresh)
+    if not diffs:
+        print(f"{hospital_id}: OK ({fresh['total']} patients)")
+        return True
+
+    print(f"{hospital_id}: {len(diffs)} mismatches")
+    for line in diffs:
+        print(f"  {line}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild / verify dashboard rollups")
+    parser.add_argument("--hospital", help="Only this hospital id")
+    parser.add_argument("--check", action="store_true", help="Compare without writing")
+    args = parser.parse_args()
+
+    hospital_ids = (
+        [args.hospital] if args.hospital
+        else [h.id for h in db.collection("hospitals").select([]).stream()]
+    )
+
+    ok = True
+    for hid in hospital_ids:
+        if args.check:
+            ok = check(hid) and ok
+        else:
+            rollup = rebuild_rollup(db, hid)
+            print(f"{hid}: rebuilt ({rollup['total']} patients, {rollup['deleted']} deleted)")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
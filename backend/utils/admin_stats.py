@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cache import TTLCache
+
+# /admin/stats is cached this long; approve / reject / new requests
+# invalidate it right away.
+ADMIN_STATS_TTL_SECONDS = 30
+
+ADMIN_STATS_KEY = "admin_stats"
+
+stats_cache = TTLCache(maxsize=1, ttl=ADMIN_STATS_TTL_SECONDS)
+
+# One thread per count, so the four round trips overlap
+stats_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="admin-stats")
+
+
+def admin_stat_queries(db):
+    requests_col = db.collection("hospital_requests")
+    return {
+        "pending": requests_col.where("status", "==", "pending"),
+        "approved": requests_col.where("status", "==", "approved"),
+        "rejected": requests_col.where("status", "==", "rejected"),
+        "hospitals": db.collection("hospitals"),
+    }
+
+
+def count_query(query):
+    """
+    Server-side count() aggregation (no documents are downloaded).
+    """
+    results = query.count(alias="count").get()
+    return int(results[0][0].value)
+
+
+def compute_admin_stats(db):
+    futures = {
+        name: stats_executor.submit(count_query, query)
+        for name, query in admin_stat_queries(db).items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def get_admin_stats(db):
+    stats = stats_cache.get(ADMIN_STATS_KEY)
+    if stats is None:
+        stats = compute_admin_stats(db)
+        stats_cache.set(ADMIN_STATS_KEY, stats)
+    return stats
+
+
+def invalidate_admin_stats():
+    stats_cache.invalidate(ADMIN_STATS_KEY)
@@ -1,12 +1,147 @@
+import hashlib
+import threading
+import time
+
+from flask import g, request
 from firebase_admin import auth
 
+from config import TOKEN_REVOCATION_CHECK_SECONDS
+from utils.cache import TTLCache
+
+# admins/{uid} membership
+ADMIN_CACHE_TTL_SECONDS = 60
+
+# Decoded claims live until the token's own exp (Firebase ID tokens last
+# an hour); the TTL passed on set() is what bounds each entry.
+token_cache = TTLCache(maxsize=4096, ttl=3600)
+admin_cache = TTLCache(maxsize=256, ttl=ADMIN_CACHE_TTL_SECONDS)
+
+# uid -> {"valid_after": ms, "disabled": bool}, refreshed with one
+# get_user call per uid every TOKEN_REVOCATION_CHECK_SECONDS
+revocation_cache = TTLCache(maxsize=4096, ttl=TOKEN_REVOCATION_CHECK_SECONDS)
+
+_revocation_locks = {}
+_revocation_locks_guard = threading.Lock()
+
+
+def _token_key(id_token: str):
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+def _revocation_lock(uid):
+    with _revocation_locks_guard:
+        return _revocation_locks.setdefault(uid, threading.Lock())
+
+
+def _revocation_state(uid):
+    state = revocation_cache.get(uid)
+    if state is not None:
+        return state
+
+    # Single flight: concurrent requests of one user share one get_user
+    with _revocation_lock(uid):
+        state = revocation_cache.get(uid)
+        if state is None:
+            user = auth.get_user(uid)
+            state = {
+                "valid_after": user.tokens_valid_after_timestamp or 0,
+                "disabled": user.disabled,
+            }
+            revocation_cache.set(uid, state)
+
+    return state
+
+
+def check_revoked(decoded):
+    """
+    The same rules as verify_id_token(check_revoked=True), against the
+    user's cached tokens_valid_after time / disabled flag.
+    """
+    state = _revocation_state(decoded["uid"])
+
+    if state["disabled"]:
+        raise auth.UserDisabledError("The user record is disabled.")
+
+    if decoded.get("iat", 0) * 1000 < state["valid_after"]:
+        raise auth.RevokedIdTokenError("The Firebase ID token has been revoked.")
+
+
+def verify_token(id_token: str):
+    """
+    Decoded claims of a Firebase ID token.
+
+    The signature / expiry check runs once per token and its claims are
+    cached until exp. Revocation and disabled users are checked per uid
+    on every call, from state refreshed every TOKEN_REVOCATION_CHECK_SECONDS
+    (60 s by default): a revoked session stops working within that window.
+    """
+    key = _token_key(id_token)
+    now = time.time()
+
+    decoded = token_cache.get(key)
+    if decoded is None or decoded.get("exp", 0) <= now:
+        decoded = auth.verify_id_token(id_token)
+
+        ttl = decoded.get("exp", 0) - now
+        if ttl > 0:
+            token_cache.set(key, decoded, ttl=ttl)
+
+    check_revoked(decoded)
+    return decoded
+
+
+def bearer_token(req):
+    auth_header = req.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return auth_header.replace("Bearer ", "").strip() or None
+
 
 # ===============================
-# 🔐 HOSPITAL TOKEN
+# 🔐 REQUEST AUTH LAYER
 # ===============================
-def verify_hospital_token(id_token: str):
-    decoded = auth.verify_id_token(id_token)
+def load_request_auth():
+    """
+    before_request hook: verifies the Bearer token once per request and
+    exposes the result on flask.g (claims, uid, email).
+
+    It never rejects a request itself; routes decide what they require.
+    """
+    g.id_token = bearer_token(request)
+    g.claims = None
+    g.uid = None
+    g.email = None
+    g.auth_error = None
+
+    if g.id_token is None or request.method == "OPTIONS":
+        return
+
+    try:
+        g.claims = verify_token(g.id_token)
+        g.uid = g.claims.get("uid")
+        g.email = g.claims.get("email")
+    except Exception as e:
+        g.auth_error = e
+
 
+def current_claims(missing_message="Authorization token missing"):
+    """
+    Claims of this request's Bearer token as verified by load_request_auth
+    (flask.g), for routes: no header parsing, no second verification.
+    """
+    if g.get("auth_error") is not None:
+        raise g.auth_error
+
+    if g.get("claims") is None:
+        raise ValueError(missing_message)
+
+    return g.claims
+
+
+# ===============================
+# 🔐 HOSPITAL TOKEN
+# ===============================
+def hospital_from_claims(decoded):
     hospital_id = decoded.get("uid")
     hospital_email = decoded.get("email")
 
@@ -16,13 +151,45 @@ def verify_hospital_token(id_token: str):
     return hospital_id, hospital_email
 
 
+def current_hospital(missing_message="Authorization token missing"):
+    """
+    (hospital_uid, hospital_email) of the request's verified token.
+    """
+    return hospital_from_claims(current_claims(missing_message))
+
+
 # ===============================
 # 🔐 ADMIN TOKEN
 # ===============================
-def verify_admin_token(token: str):
-    decoded = auth.verify_id_token(token)
-
+def admin_from_claims(decoded):
     if not decoded.get("admin", False):
         raise ValueError("Not an admin user")
 
-    return decoded
\ No newline at end of file
+    return decoded
+
+
+def is_admin(uid: str):
+    """
+    admins/{uid} exists (cached for ADMIN_CACHE_TTL_SECONDS).
+    """
+    cached = admin_cache.get(uid)
+    if cached is not None:
+        return cached
+
+    from firebase import db
+
+    exists = db.collection("admins").document(uid).get().exists
+    admin_cache.set(uid, exists)
+    return exists
+
+
+def verify_admin():
+    """
+    Admin panel auth: the request's verified token, whose uid is listed
+    in `admins`.
+    """
+    decoded = current_claims("Missing Authorization header")
+    if not is_admin(decoded["uid"]):
+        raise ValueError("Not an admin user")
+
+    return decoded
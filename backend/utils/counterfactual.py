@@ -0,0 +1,173 @@
+import itertools
+import time
+
+import numpy as np
+
+from ml.features import FEATURE_INDEX, encode_one
+from utils.risk_mapper import LOW_RISK_BELOW, map_risk
+
+# Candidate rows per scaler + forest call (the time budget is checked between calls)
+COUNTERFACTUAL_CHUNK_ROWS = 512
+
+# Lowest targets the search will suggest
+MIN_SYSTOLIC = 110
+MIN_BMI = 22.0
+PULSE_PRESSURE = 40
+
+
+def _bp_levels(data):
+    current = float(data["ap_hi"])
+    top = 5 * np.ceil(current / 5) - 5
+    return np.arange(top, MIN_SYSTOLIC - 1, -5, dtype=np.float64)
+
+
+def _weight_levels(data):
+    current = float(data["weight"])
+    floor = MIN_BMI * (float(data["height"]) / 100) ** 2
+    return np.arange(current - 2, floor - 1e-9, -2, dtype=np.float64)
+
+
+def _switch_to(field, value):
+    def levels(data):
+        if int(data.get(field, 0)) == value:
+            return np.empty(0)
+        return np.array([value], dtype=np.float64)
+    return levels
+
+
+# (input field, cost of one unit of change, candidate values for this patient)
+# Values are ordered from the smallest change to the largest.
+ACTIONABLE_LEVERS = [
+    ("ap_hi", 10.0, _bp_levels),
+    ("weight", 5.0, _weight_levels),
+    ("smoke", 1.0, _switch_to("smoke", 0)),
+    ("alco", 1.0, _switch_to("alco", 0)),
+    ("active", 1.0, _switch_to("active", 1)),
+]
+
+
+def _apply(X, base_data, field, values):
+    if field == "ap_hi":
+        # Lowering systolic pulls diastolic down with it (keeps ap_lo < ap_hi)
+        X[:, FEATURE_INDEX["ap_hi"]] = values
+        X[:, FEATURE_INDEX["ap_lo"]] = np.minimum(float(base_data["ap_lo"]), values - PULSE_PRESSURE)
+    elif field == "weight":
+        height_m = float(base_data["height"]) / 100
+        X[:, FEATURE_INDEX["weight"]] = values
+        X[:, FEATURE_INDEX["bmi"]] = values / height_m ** 2
+    else:
+        X[:, FEATURE_INDEX[field]] = values
+
+
+def _candidates(base, base_data, levers, k):
+    """
+    Every way of changing exactly k levers, as (fields, values, cost, X).
+    """
+    for combo in itertools.combinations(levers, k):
+        fields = [field for field, _, _ in combo]
+        mesh = np.meshgrid(*(values for _, _, values in combo), indexing="ij")
+        values = np.stack([m.ravel() for m in mesh], axis=1)
+
+        cost = np.zeros(len(values))
+        X = np.tile(base, (len(values), 1))
+        for j, (field, unit, _) in enumerate(combo):
+            cost += np.abs(values[:, j] - float(base_data[field])) / unit
+            _apply(X, base_data, field, values[:, j])
+
+        yield fields, values, cost, X
+
+
+def describe_changes(input_data, fields, values):
+    changes = []
+    for field, value in zip(fields, values):
+        changes.append({"field": field, "from": float(input_data[field]), "to": float(value)})
+
+        if field == "ap_hi":
+            ap_lo = float(input_data["ap_lo"])
+            new_ap_lo = min(ap_lo, float(value) - PULSE_PRESSURE)
+            if new_ap_lo < ap_lo:
+                changes.append({"field": "ap_lo", "from": ap_lo, "to": new_ap_lo})
+
+    return changes
+
+
+def counterfactual_search(model, scaler, input_data: dict, budget_ms: float):
+    """
+    Smallest set of actionable changes that brings the patient to Low risk.
+
+    Fewer changed features always wins; among those, the smallest total
+    change (in lever units: 10 mmHg, 5 kg, one habit). Every candidate of
+    a given size is scored in chunked scaler.transform + predict_proba
+    calls, and the search stops when `budget_ms` is spent.
+
+    Returns:
+        dict: base / new probability, changes, and search stats.
+              complete=False means the budget ran out first.
+    """
+    started = time.monotonic()
+    deadline = started + budget_ms / 1000.0
+
+    base, _ = encode_one(input_data)
+    base_probability = float(model.predict_proba(scaler.transform(base[np.newaxis, :]))[0][1])
+
+    levers = [
+        (field, unit, levels(input_data))
+        for field, unit, levels in ACTIONABLE_LEVERS
+    ]
+    levers = [lever for lever in levers if lever[2].size]
+
+    best = None
+    closest = None
+    scored = 0
+    complete = True
+
+    if base_probability >= LOW_RISK_BELOW:
+        for k in range(1, len(levers) + 1):
+            for fields, values, cost, X in _candidates(base, input_data, levers, k):
+                for start in range(0, len(X), COUNTERFACTUAL_CHUNK_ROWS):
+                    if time.monotonic() >= deadline:
+                        complete = False
+                        break
+
+                    end = start + COUNTERFACTUAL_CHUNK_ROWS
+                    probs = model.predict_proba(scaler.transform(X[start:end]))[:, 1]
+                    scored += len(probs)
+
+                    i = int(np.argmin(probs))
+                    if closest is None or probs[i] < closest[2]:
+                        closest = (fields, values[start + i], float(probs[i]))
+
+                    reached = np.flatnonzero(probs < LOW_RISK_BELOW)
+                    if reached.size:
+                        # Cheapest first, lower probability breaks ties
+                        i = reached[np.lexsort((probs[reached], cost[start:end][reached]))[0]]
+                        candidate = (fields, values[start + i], float(probs[i]), float(cost[start + i]))
+                        if best is None or (candidate[3], candidate[2]) < (best[3], best[2]):
+                            best = candidate
+
+                if not complete:
+                    break
+
+            if best is not None or not complete:
+                break
+
+    if base_probability < LOW_RISK_BELOW:
+        fields, values, probability = [], [], base_probability
+    elif best is not None:
+        fields, values, probability = best[0], best[1], best[2]
+    elif closest is not None:
+        fields, values, probability = closest
+    else:
+        fields, values, probability = [], [], base_probability
+
+    return {
+        "base_probability": round(base_probability, 3),
+        "base_risk_level": map_risk(base_probability),
+        "probability": round(probability, 3),
+        "risk_level": map_risk(probability),
+        "reached_low": probability < LOW_RISK_BELOW,
+        "changes": describe_changes(input_data, fields, values),
+        "complete": complete,
+        "candidates_scored": scored,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+    }
@@ -0,0 +1,198 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+
+# Patient counters for /dashboard/analytics live in ROLLUP_SHARDS documents
+# under hospitals/{id}/meta; each write increments one random shard so
+# concurrent registrations don't contend on a single document.
+# Changing the shard count requires running scripts/rebuild_dashboard_rollups.py.
+ROLLUP_SHARDS = 4
+ROLLUP_DOC_PREFIX = "dashboard_rollup_"
+
+DAILY_WINDOW_DAYS = 30
+
+# Written on shard 0 by rebuild_rollup only. Shards without it hold just
+# the increments made since deploy (no historical totals), so the
+# dashboard falls back to scan_rollup until the rebuild script has run.
+ROLLUP_VERSION = 1
+
+
+def rollup_refs(db, hospital_id):
+    meta = db.collection("hospitals").document(hospital_id).collection("meta")
+    return [meta.document(f"{ROLLUP_DOC_PREFIX}{i}") for i in range(ROLLUP_SHARDS)]
+
+
+def _random_shard(db, hospital_id):
+    return rollup_refs(db, hospital_id)[random.randrange(ROLLUP_SHARDS)]
+
+
+def day_key(value):
+    """
+    UTC calendar day (YYYY-MM-DD) of a datetime; naive means UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date().isoformat()
+
+
+# ===============================
+# WRITES (added to the caller's batch / transaction)
+# ===============================
+def record_patient_created(batch, db, hospital_id, created_at):
+    """
+    +1 total and +1 on the creation day, committed with the patient write.
+
+    `created_at` must be the value stored on the patient, so the delete
+    path decrements the same day bucket.
+    """
+    day = day_key(created_at)
+    batch.set(
+        _random_shard(db, hospital_id),
+        {
+            "total": firestore.Increment(1),
+            "daily": {day: firestore.Increment(1)},
+        },
+        merge=True
+    )
+
+
+def record_patient_deleted(batch, db, hospital_id, created_at):
+    """
+    +1 deleted; the patient no longer counts on its creation day.
+    """
+    update = {"deleted": firestore.Increment(1)}
+    if created_at:
+        update["daily"] = {day_key(created_at): firestore.Increment(-1)}
+
+    batch.set(_random_shard(db, hospital_id), update, merge=True)
+
+
+# ===============================
+# READ / REBUILD
+# ===============================
+def merge_shards(shards):
+    rollup = {"total": 0, "deleted": 0, "daily": {}}
+    for shard in shards:
+        rollup["total"] += shard.get("total", 0)
+        rollup["deleted"] += shard.get("deleted", 0)
+        for day, count in (shard.get("daily") or {}).items():
+            rollup["daily"][day] = rollup["daily"].get(day, 0) + count
+    return rollup
+
+
+def read_rollup(db, hospital_id):
+    """
+    Summed shards (ROLLUP_SHARDS reads in one round trip), or None when
+    the rollup was never built by rebuild_rollup (or by an older version).
+    """
+    refs = rollup_refs(db, hospital_id)
+    shards = {
+        snap.id: snap.to_dict() or {}
+        for snap in db.get_all(refs)
+        if snap.exists
+    }
+
+    if shards.get(refs[0].id, {}).get("version") != ROLLUP_VERSION:
+        return None
+
+    return merge_shards(shards.values())
+
+
+def compute_rollup(patients):
+    """
+    Rollup from patient dicts (is_deleted, created_at) - the same rules
+    the counters are maintained with.
+    """
+    rollup = {"total": 0, "deleted": 0, "daily": {}}
+
+    for d in patients:
+        rollup["total"] += 1
+
+        if d.get("is_deleted") is True:
+            rollup["deleted"] += 1
+            continue
+
+        created_at = d.get("created_at")
+        if created_at:
+            day = day_key(created_at)
+            rollup["daily"][day] = rollup["daily"].get(day, 0) + 1
+
+    return rollup
+
+
+def _patients_query(db, hospital_id):
+    return (
+        db.collection("hospitals")
+        .document(hospital_id)
+        .collection("patients")
+        .select(["created_at", "is_deleted"])
+    )
+
+
+def scan_rollup(db, hospital_id):
+    """
+    Rollup computed from every patient document, without writing it.
+    """
+    patients = _patients_query(db, hospital_id).stream()
+    return compute_rollup(doc.to_dict() or {} for doc in patients)
+
+
+@firestore.transactional
+def _rebuild_in_transaction(transaction, db, hospital_id):
+    refs = rollup_refs(db, hospital_id)
+
+    # Reading every shard first makes a create / delete that increments
+    # one of them conflict with this transaction, so no increment made
+    # during the scan is lost when the shards are overwritten.
+    list(transaction.get_all(refs))
+
+    patients = transaction.get(_patients_query(db, hospital_id))
+    rollup = compute_rollup(doc.to_dict() or {} for doc in patients)
+
+    for i, ref in enumerate(refs):
+        if i == 0:
+            transaction.set(ref, {
+                **rollup,
+                "version": ROLLUP_VERSION,
+                "built_at": firestore.SERVER_TIMESTAMP,
+            })
+        else:
+            transaction.set(ref, {"total": 0, "deleted": 0, "daily": {}})
+
+    return rollup
+
+
+def rebuild_rollup(db, hospital_id):
+    """
+    Recomputes the rollup from every patient document and overwrites the
+    shards in one transaction (shard 0 holds the totals and the version
+    marker, the others are reset). It reads the whole patient collection,
+    so it runs from scripts/rebuild_dashboard_rollups.py, not per request.
+    """
+    return _rebuild_in_transaction(db.transaction(), db, hospital_id)
+
+
+def analytics_view(rollup, now=None):
+    """
+    /dashboard/analytics response body from a rollup.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.astimezone(timezone.utc).date()
+    daily = rollup["daily"]
+
+    daily_list = []
+    for i in range(DAILY_WINDOW_DAYS):
+        key = (today - timedelta(days=DAILY_WINDOW_DAYS - 1 - i)).isoformat()
+        daily_list.append({
+            "date": key,
+            "count": daily.get(key, 0)
+        })
+
+    return {
+        "total_patients": rollup["total"],
+        "deleted_patients": rollup["deleted"],
+        "new_today": daily.get(today.isoformat(), 0),
+        "new_last_7_days": sum(d["count"] for d in daily_list[-7:]),
+        "daily_counts": daily_list
+    }
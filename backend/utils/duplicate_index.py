@@ -0,0 +1,258 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from utils.cache import TTLCache
+from utils.patient_index import name_trigrams
+
+# Jaccard similarity of name trigrams needed to report a possible duplicate
+DUPLICATE_SIMILARITY_THRESHOLD = 0.4
+
+# Ages within +/- this many years are compared (typos in age / birthdays)
+DUPLICATE_AGE_TOLERANCE = 1
+
+MAX_DUPLICATE_MATCHES = 3
+
+# Writes made by this process update its index in place (index_patient /
+# unindex_patient). Writes made by other workers are merged by a lookup
+# that queries patients with updated_at newer than the last sync, at
+# most once per DUPLICATE_INDEX_SYNC_SECONDS. The full re-stream is only
+# a safety net for writes that do not set updated_at.
+DUPLICATE_INDEX_TTL_SECONDS = 6 * 3600
+DUPLICATE_INDEX_SYNC_SECONDS = 10
+
+# Each sync re-reads this much before the previous one started, to cover
+# clock skew between workers and Firestore and commits still in flight.
+DUPLICATE_INDEX_SYNC_OVERLAP_SECONDS = 60
+
+# Patient fields the index is built from (select() projection)
+DUPLICATE_INDEX_FIELDS = [
+    "patient_id",
+    "name",
+    "age",
+    "primary_mobile",
+    "name_trigrams",
+    "is_deleted",
+]
+
+
+class NameTrigramIndex:
+    """
+    In-memory inverted index (age, trigram) -> patient ids.
+
+    Keying postings by age keeps each lookup to the few patients with a
+    nearby age, and only the rarest query trigrams are probed (prefix
+    filtering), so a query costs O(candidates), not O(patients).
+    """
+
+    def __init__(self):
+        self.patients = {}
+        self.postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+        # Wall-clock start of the last build / sync, and when it was checked
+        self.synced_at = None
+        self.checked_at = 0.0
+
+    def __len__(self):
+        return len(self.patients)
+
+    def add(self, patient_id, name, age, primary_mobile=None, trigrams=None):
+        grams = list(trigrams) if trigrams else name_trigrams(name)
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            self._remove(patient_id)
+            if not grams:
+                return
+
+            self.patients[patient_id] = {
+                "patient_id": patient_id,
+                "name": name,
+                "age": age,
+                "primary_mobile": primary_mobile,
+                "trigrams": frozenset(grams),
+            }
+            for gram in grams:
+                self.postings[(age, gram)].add(patient_id)
+
+    def remove(self, patient_id):
+        with self._lock:
+            self._remove(patient_id)
+
+    def _remove(self, patient_id):
+        entry = self.patients.pop(patient_id, None)
+        if entry is None:
+            return
+        for gram in entry["trigrams"]:
+            key = (entry["age"], gram)
+            ids = self.postings.get(key)
+            if ids is not None:
+                ids.discard(patient_id)
+                if not ids:
+                    del self.postings[key]
+
+    def search(
+        self,
+        name,
+        age,
+        threshold=DUPLICATE_SIMILARITY_THRESHOLD,
+        age_tolerance=DUPLICATE_AGE_TOLERANCE,
+        limit=MAX_DUPLICATE_MATCHES
+    ):
+        """
+        Most similar patients with |age - a| <= age_tolerance, as
+        (similarity, patient) pairs, best first.
+        """
+        grams = name_trigrams(name)
+        if not grams:
+            return []
+
+        ages = range(age - age_tolerance, age + age_tolerance + 1)
+        query = frozenset(grams)
+
+        # Jaccard >= threshold needs at least `need` shared trigrams, so a
+        # match must contain one of the (len - need + 1) rarest ones.
+        need = max(1, math.ceil(threshold * len(grams)))
+
+        with self._lock:
+            by_rarity = sorted(
+                grams,
+                key=lambda g: sum(len(self.postings.get((a, g), ())) for a in ages)
+            )
+
+            candidates = set()
+            for gram in by_rarity[:len(grams) - need + 1]:
+                for a in ages:
+                    candidates.update(self.postings.get((a, gram), ()))
+
+            scored = []
+            for patient_id in candidates:
+                entry = self.patients[patient_id]
+                common = len(query & entry["trigrams"])
+                similarity = common / (len(query) + len(entry["trigrams"]) - common)
+                if similarity >= threshold:
+                    scored.append((similarity, entry))
+
+        scored.sort(key=lambda item: (-item[0], abs(item[1]["age"] - age)))
+        return scored[:limit]
+
+
+duplicate_indexes = TTLCache(maxsize=64, ttl=DUPLICATE_INDEX_TTL_SECONDS)
+
+# One build lock per hospital: a cold start at a large hospital never
+# blocks duplicate checks at the others.
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+
+def _build_lock(hospital_id):
+    with _build_locks_guard:
+        return _build_locks.setdefault(hospital_id, threading.Lock())
+
+
+def _merge(index, doc):
+    d = doc.to_dict() or {}
+    patient_id = d.get("patient_id", doc.id)
+
+    if d.get("is_deleted") is True:
+        index.remove(patient_id)
+    else:
+        index.add(
+            patient_id,
+            d.get("name"),
+            d.get("age"),
+            d.get("primary_mobile"),
+            d.get("name_trigrams")
+        )
+
+
+def build_duplicate_index(patients_col):
+    index = NameTrigramIndex()
+    index.synced_at = time.time()
+    index.checked_at = time.monotonic()
+
+    query = (
+        patients_col
+        .where("is_deleted", "==", False)
+        .select(DUPLICATE_INDEX_FIELDS)
+    )
+
+    for doc in query.stream():
+        _merge(index, doc)
+
+    return index
+
+
+def sync_duplicate_index(index, patients_col):
+    """
+    Merge patients created, edited or deleted since the last sync.
+    """
+    started = time.time()
+    since = datetime.fromtimestamp(
+        index.synced_at - DUPLICATE_INDEX_SYNC_OVERLAP_SECONDS, timezone.utc
+    )
+
+    query = (
+        patients_col
+        .where("updated_at", ">", since)
+        .select(DUPLICATE_INDEX_FIELDS)
+    )
+
+    for doc in query.stream():
+        _merge(index, doc)
+
+    index.synced_at = started
+
+
+def get_duplicate_index(hospital_id, patients_col):
+    """
+    Cached index of a hospital's non-deleted patients (built on first use,
+    then kept current with sync_duplicate_index).
+    """
+    index = duplicate_indexes.get(hospital_id)
+
+    if index is None:
+        with _build_lock(hospital_id):
+            index = duplicate_indexes.get(hospital_id)
+            if index is None:
+                index = build_duplicate_index(patients_col)
+                duplicate_indexes.set(hospital_id, index)
+        return index
+
+    if time.monotonic() - index.checked_at < DUPLICATE_INDEX_SYNC_SECONDS:
+        return index
+
+    # Single flight: while one thread syncs, the others use the index as is
+    lock = _build_lock(hospital_id)
+    if not lock.acquire(blocking=False):
+        return index
+
+    try:
+        if time.monotonic() - index.checked_at >= DUPLICATE_INDEX_SYNC_SECONDS:
+            sync_duplicate_index(index, patients_col)
+            index.checked_at = time.monotonic()
+    finally:
+        lock.release()
+
+    return index
+
+
+def index_patient(hospital_id, patient_id, name, age, primary_mobile=None):
+    """
+    Keep a cached index in sync with a write made by this process.
+    """
+    index = duplicate_indexes.get(hospital_id)
+    if index is not None:
+        index.add(patient_id, name, age, primary_mobile)
+
+
+def unindex_patient(hospital_id, patient_id):
+    index = duplicate_indexes.get(hospital_id)
+    if index is not None:
+        index.remove(patient_id)
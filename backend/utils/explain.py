@@ -26,6 +26,31 @@ def get_top_features(model, feature_names, top_n=5):
     return results
 
 
+def get_feature_contributions(model, X, feature_names, top_n=5):
+    """
+    Per-prediction contributions for every row of X (scaled features),
+    computed from each tree's decision path. Positive values pushed the
+    risk up, negative values pulled it down.
+
+    Returns one list per row, largest absolute contribution first.
+    """
+    _, contributions = model.contributions(X)
+
+    results = []
+    for row in contributions:
+        indices = np.argsort(-np.abs(row))[:top_n]
+        results.append([
+            {
+                "feature": feature_names[idx],
+                "contribution": round(float(row[idx]), 3)
+            }
+            for idx in indices
+            if row[idx] != 0
+        ])
+
+    return results
+
+
 def explain_symptoms(data: dict):
     """
     Rule-based clinical explanations for symptoms.
@@ -0,0 +1,58 @@
+from utils.cache import TTLCache
+
+# Per-process uid / email -> hospital_id (the mapping never changes for a uid)
+HOSPITAL_CACHE_TTL_SECONDS = 3600
+
+hospital_cache = TTLCache(maxsize=4096, ttl=HOSPITAL_CACHE_TTL_SECONDS)
+
+
+def remember_hospital(uid, email, hospital_id):
+    """
+    Store the mapping under both keys (also used to warm from /auth/me).
+    """
+    if uid:
+        hospital_cache.set(("uid", uid), hospital_id)
+    if email:
+        hospital_cache.set(("email", email), hospital_id)
+
+
+def invalidate_hospital(uid=None, email=None):
+    if uid:
+        hospital_cache.invalidate(("uid", uid))
+    if email:
+        hospital_cache.invalidate(("email", email))
+
+
+def get_hospital_id_by_email(email: str) -> str:
+    from firebase import db
+
+    hospitals = (
+        db.collection("hospitals")
+        .where("email", "==", email)
+        .limit(1)
+        .stream()
+    )
+
+    for hospital in hospitals:
+        return hospital.id
+
+    raise ValueError("Hospital not registered in Firestore")
+
+
+def get_hospital_id(uid: str, email: str) -> str:
+    """
+    hospital_id of an authenticated hospital user.
+
+    Firestore is only queried on the first request per uid (or after
+    HOSPITAL_CACHE_TTL_SECONDS / an explicit invalidate_hospital).
+    """
+    hospital_id = hospital_cache.get(("uid", uid))
+    if hospital_id is not None:
+        return hospital_id
+
+    hospital_id = hospital_cache.get(("email", email))
+    if hospital_id is None:
+        hospital_id = get_hospital_id_by_email(email)
+
+    remember_hospital(uid, email, hospital_id)
+    return hospital_id
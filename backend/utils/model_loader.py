@@ -1,19 +1,19 @@
-import os
-import joblib
-from firebase_admin import storage
+from config import MODEL_CACHE_DIR
+from ml.registry import BucketModelStore, ModelRegistry, get_registry
 
-MODEL_BUCKET_PATH = "model.pkl"   # ✅ FIXED
-LOCAL_MODEL_PATH = "/tmp/model.pkl"
 
 def load_model():
-    bucket = storage.bucket()
+    """
+    Active model from the registry.
 
-    blobs = list(bucket.list_blobs())
+    The artifact is cached under MODEL_CACHE_DIR and only downloaded
+    again when its checksum no longer matches the manifest.
+    """
+    registry = get_registry() or ModelRegistry(BucketModelStore(), MODEL_CACHE_DIR)
 
-    blob = bucket.blob("model.pkl")
+    version = registry.active_version()
+    if not version:
+        raise FileNotFoundError("No active model version in the registry")
 
-    if not blob.exists():
-        raise FileNotFoundError("model.pkl not found in Firebase Storage")
-
-    blob.download_to_filename("/tmp/model.pkl")
-    return joblib.load("/tmp/model.pkl")
\ No newline at end of file
+    model, _, _ = registry.load(version)
+    return model
@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_admin import firestore
+
+# Firestore accepts at most 500 writes per batch commit
+OUTCOME_BATCH_SIZE = 500
+
+# Attempts per batch commit, with exponential backoff between them
+OUTCOME_COMMIT_ATTEMPTS = 4
+OUTCOME_RETRY_BASE_SECONDS = 0.5
+
+outcome_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outcomes")
+
+
+def _commit_with_retry(db, refs, update):
+    for attempt in range(OUTCOME_COMMIT_ATTEMPTS):
+        batch = db.batch()
+        for ref in refs:
+            batch.set(ref, update, merge=True)
+        try:
+            batch.commit()
+            return
+        except Exception as e:
+            if attempt == OUTCOME_COMMIT_ATTEMPTS - 1:
+                raise
+            print("OUTCOME COMMIT RETRY:", e)
+            time.sleep(OUTCOME_RETRY_BASE_SECONDS * 2 ** attempt)
+
+
+def propagate_cardiac_arrest(db, patient_ref, confirmed_by):
+    """
+    Marks every record of the patient with the confirmed outcome in
+    batches of OUTCOME_BATCH_SIZE. The merge writes are idempotent, so a
+    retried batch is harmless. Returns the number of records written.
+    """
+    update = {
+        "outcome": {
+            "cardiac_arrest": 1,
+            "confirmed_by": confirmed_by or "doctor",
+            "confirmed_at": firestore.SERVER_TIMESTAMP
+        }
+    }
+
+    # Only the references are needed
+    records = patient_ref.collection("records").select([]).stream()
+
+    written = 0
+    chunk = []
+    for rec in records:
+        chunk.append(rec.reference)
+        if len(chunk) == OUTCOME_BATCH_SIZE:
+            _commit_with_retry(db, chunk, update)
+            written += len(chunk)
+            chunk = []
+
+    if chunk:
+        _commit_with_retry(db, chunk, update)
+        written += len(chunk)
+
+    return written
+
+
+def schedule_cardiac_arrest_propagation(db, patient_ref, confirmed_by):
+    """
+    Runs propagate_cardiac_arrest off the request path.
+    """
+    def job():
+        try:
+            propagate_cardiac_arrest(db, patient_ref, confirmed_by)
+        except Exception as e:
+            print("OUTCOME PROPAGATION ERROR:", patient_ref.id, e)
+
+    return outcome_worker.submit(job)
@@ -0,0 +1,105 @@
+import threading
+
+from firebase_admin import firestore
+
+# IDs leased per transaction on meta/patient_counter. A worker that exits
+# with part of a block unused leaves a gap in the sequence, never a
+# duplicate.
+PATIENT_ID_BLOCK_SIZE = 100
+
+PATIENT_ID_DIGITS = 12
+
+
+def format_patient_id(n):
+    return str(n).zfill(PATIENT_ID_DIGITS)
+
+
+class IdBlockAllocator:
+    """
+    Hands out sequential IDs per hospital from blocks leased with
+    `lease_block(hospital_id, size) -> first id of the block`.
+
+    Only a block change touches the counter document; every other call
+    is a lock-protected increment in memory.
+    """
+
+    def __init__(self, lease_block, block_size=PATIENT_ID_BLOCK_SIZE):
+        self.lease_block = lease_block
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self._lease_locks = {}
+
+    def _lease_lock(self, hospital_id):
+        with self._lock:
+            return self._lease_locks.setdefault(hospital_id, threading.Lock())
+
+    def _take(self, hospital_id):
+        with self._lock:
+            block = self._blocks.get(hospital_id)
+            if block and block[0] < block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+        return None
+
+    def allocate(self, hospital_id):
+        value = self._take(hospital_id)
+        if value is not None:
+            return value
+
+        # One lease per hospital at a time; threads that waited for it
+        # take from the fresh block instead of leasing another one.
+        with self._lease_lock(hospital_id):
+            value = self._take(hospital_id)
+            if value is not None:
+                return value
+
+            start = self.lease_block(hospital_id, self.block_size)
+            with self._lock:
+                self._blocks[hospital_id] = [start + 1, start + self.block_size]
+            return start
+
+    def forget(self, hospital_id=None):
+        """
+        Drop leased blocks (the unused rest becomes a gap).
+        """
+        with self._lock:
+            if hospital_id is None:
+                self._blocks.clear()
+            else:
+                self._blocks.pop(hospital_id, None)
+
+
+def patient_counter_ref(db, hospital_id):
+    return (
+        db.collection("hospitals")
+        .document(hospital_id)
+        .collection("meta")
+        .document("patient_counter")
+    )
+
+
+@firestore.transactional
+def _lease_in_transaction(transaction, counter_ref, size):
+    snap = counter_ref.get(transaction=transaction)
+    last_id = (snap.to_dict() or {}).get("last_id", 0) if snap.exists else 0
+
+    transaction.set(counter_ref, {"last_id": last_id + size}, merge=True)
+    return last_id + 1
+
+
+def lease_patient_id_block(hospital_id, size):
+    """
+    Reserves [last_id + 1, last_id + size] in one Firestore transaction.
+    """
+    from firebase import db
+
+    return _lease_in_transaction(db.transaction(), patient_counter_ref(db, hospital_id), size)
+
+
+patient_id_allocator = IdBlockAllocator(lease_patient_id_block)
+
+
+def generate_patient_id(hospital_id):
+    return format_patient_id(patient_id_allocator.allocate(hospital_id))
@@ -0,0 +1,105 @@
+import re
+
+# Shortest query /patients/search answers, and the longest prefix stored
+# per name token (longer queries match on this prefix, then get filtered).
+MIN_SEARCH_PREFIX = 3
+MAX_NAME_PREFIX = 12
+
+# search_prefixes entries are namespaced so digits never match name tokens
+NAME_PREFIX_TAG = "n:"
+MOBILE_PREFIX_TAG = "m:"
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+_PHONE_PUNCTUATION = re.compile(r"[\s\-+().]")
+
+
+def normalize_name(name):
+    """
+    Lower-cased, single-spaced name used for prefix queries.
+    """
+    if not name:
+        return None
+    return " ".join(str(name).lower().split())
+
+
+def name_tokens(name):
+    normalized = normalize_name(name)
+    if not normalized:
+        return []
+    return [t for t in _TOKEN_SPLIT.split(normalized) if t]
+
+
+def mobile_digits(value):
+    return "".join(filter(str.isdigit, str(value or "")))
+
+
+def search_prefixes(name, mobile_norm=None):
+    """
+    Every searchable prefix of the name tokens and the normalized mobile,
+    stored as an array so one array_contains query finds a patient.
+    """
+    prefixes = set()
+
+    for token in name_tokens(name):
+        for n in range(MIN_SEARCH_PREFIX, min(len(token), MAX_NAME_PREFIX) + 1):
+            prefixes.add(NAME_PREFIX_TAG + token[:n])
+
+    digits = mobile_digits(mobile_norm)
+    for n in range(MIN_SEARCH_PREFIX, len(digits) + 1):
+        prefixes.add(MOBILE_PREFIX_TAG + digits[:n])
+
+    return sorted(prefixes)
+
+
+def search_key(query):
+    """
+    (search_prefixes entry, name tokens to check) for a search query.
+
+    Digit queries look up a mobile prefix. Name queries look up the
+    longest token; all tokens are then checked on the matched documents.
+    """
+    compact = _PHONE_PUNCTUATION.sub("", str(query or ""))
+    if compact.isdigit():
+        if len(compact) < MIN_SEARCH_PREFIX:
+            return None, []
+        return MOBILE_PREFIX_TAG + compact, []
+
+    tokens = name_tokens(query)
+    key_token = max(tokens, key=len) if tokens else ""
+    if len(key_token) < MIN_SEARCH_PREFIX:
+        return None, []
+
+    return NAME_PREFIX_TAG + key_token[:MAX_NAME_PREFIX], tokens
+
+
+def matches_name_tokens(name, query_tokens):
+    """
+    Every query token is a prefix of some token of `name`.
+    """
+    tokens = name_tokens(name)
+    return all(any(t.startswith(q) for t in tokens) for q in query_tokens)
+
+
+def name_trigrams(name):
+    """
+    Trigrams of each name token padded as "  tok " (pg_trgm style), so
+    word starts weigh more than word middles.
+    """
+    grams = set()
+    for token in name_tokens(name):
+        padded = "  " + token + " "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return sorted(grams)
+
+
+def patient_index_fields(name, mobile_norm=None):
+    """
+    Derived fields the patient list / search queries filter on.
+    Stored next to the fields they are derived from on every write.
+    """
+    return {
+        "name_lower": normalize_name(name),
+        "search_prefixes": search_prefixes(name, mobile_norm),
+        "name_trigrams": name_trigrams(name),
+    }
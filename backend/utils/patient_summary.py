@@ -0,0 +1,294 @@
+import math
+
+from firebase_admin import firestore
+
+from utils.health_score import calculate_health_score
+
+# Record fields a summary is built from (select() projection)
+SUMMARY_RECORD_FIELDS = ["created_at", "probability", "risk_level", "prediction"]
+
+# |latest - first| above this is a trend (same rule as the timeline)
+TREND_THRESHOLD = 0.05
+
+
+def empty_summary():
+    return {
+        "records_count": 0,
+        "first_probability": None,
+        "first_visit_at": None,
+        "latest_probability": None,
+        "latest_risk_level": None,
+        "last_visit_at": None,
+        "sum_probability": 0.0,
+        "sum_sq_probability": 0.0,
+        "scored_count": 0,
+    }
+
+
+def record_probability(data):
+    prob = (
+        data.get("probability")
+        or (data.get("prediction") or {}).get("probability")
+    )
+    return prob if isinstance(prob, (int, float)) else None
+
+
+def record_risk_level(data):
+    return (
+        data.get("risk_level")
+        or (data.get("prediction") or {}).get("risk_level")
+    )
+
+
+def add_visit(summary, probability, risk_level, visit_at):
+    """
+    Summary after appending one visit (the newest one).
+    """
+    summary = {**empty_summary(), **(summary or {})}
+    summary["records_count"] += 1
+
+    if probability is not None:
+        if summary["first_probability"] is None:
+            summary["first_probability"] = probability
+            summary["first_visit_at"] = visit_at
+        summary["latest_probability"] = probability
+        summary["sum_probability"] += probability
+        summary["sum_sq_probability"] += probability ** 2
+        summary["scored_count"] += 1
+
+    summary["latest_risk_level"] = risk_level
+    summary["last_visit_at"] = visit_at
+    return summary
+
+
+def rebuild_summary(records):
+    """
+    Summary from (created_at, data) pairs sorted oldest -> newest.
+    """
+    summary = empty_summary()
+    for created_at, data in records:
+        summary = add_visit(
+            summary,
+            record_probability(data),
+            record_risk_level(data),
+            created_at
+        )
+    return summary
+
+
+def is_complete_summary(summary):
+    """
+    Written by the transactional helpers below or the backfill script
+    (a legacy patient may only hold {"cardiac_arrest": 1}, or nothing).
+    """
+    return bool(summary) and "records_count" in summary
+
+
+def summary_view(summary):
+    """
+    Response block: records count, latest risk, trend and health score.
+    """
+    summary = {**empty_summary(), **(summary or {})}
+
+    first = summary["first_probability"]
+    latest = summary["latest_probability"]
+    scored = summary["scored_count"]
+
+    trend = {"status": "insufficient_data", "delta": None}
+    if scored >= 2 and first is not None and latest is not None:
+        delta = round(latest - first, 3)
+        trend["delta"] = delta
+        trend["status"] = (
+            "worsening" if delta > TREND_THRESHOLD
+            else "improving" if delta < -TREND_THRESHOLD
+            else "stable"
+        )
+
+    mean = std = None
+    if scored:
+        mean = summary["sum_probability"] / scored
+        std = math.sqrt(max(0.0, summary["sum_sq_probability"] / scored - mean ** 2))
+
+    return {
+        "records_count": summary["records_count"],
+        "first_probability": first,
+        "latest_probability": latest,
+        "latest_risk_level": summary["latest_risk_level"],
+        "last_visit_at": summary["last_visit_at"],
+        "mean_probability": round(mean, 3) if mean is not None else None,
+        "std_probability": round(std, 3) if std is not None else None,
+        "trend": trend,
+        "health_score": calculate_health_score(latest, trend["status"]),
+        "cardiac_arrest": summary.get("cardiac_arrest", 0),
+    }
+
+
+# ===============================
+# TRANSACTIONAL WRITES
+# ===============================
+def _stored_summary(transaction, patient_ref, snap):
+    """
+    patient.summary as read in this transaction. A patient from before
+    summaries existed is seeded from its records first, so the next write
+    doesn't start counting from this visit.
+    """
+    summary = (snap.to_dict() or {}).get("summary") if snap.exists else None
+    if is_complete_summary(summary):
+        return summary
+
+    records = transaction.get(
+        patient_ref.collection("records")
+        .select(SUMMARY_RECORD_FIELDS)
+        .order_by("created_at")
+    )
+    seeded = rebuild_summary(
+        (record.get("created_at"), record.to_dict() or {})
+        for record in records
+    )
+    return {**(summary or {}), **seeded}
+
+
+@firestore.transactional
+def _save_visit(transaction, patient_ref, record_ref, record, patient_update):
+    snap = patient_ref.get(transaction=transaction)
+    current = _stored_summary(transaction, patient_ref, snap)
+
+    summary = add_visit(
+        current,
+        record_probability(record),
+        record_risk_level(record),
+        firestore.SERVER_TIMESTAMP
+    )
+    summary.update(patient_update.get("summary") or {})
+
+    transaction.set(record_ref, record)
+    transaction.set(patient_ref, {**patient_update, "summary": summary}, merge=True)
+
+
+def save_visit(db, patient_ref, record_ref, record, patient_update):
+    """
+    Writes a new record and updates patient.summary in one transaction.
+    """
+    _save_visit(db.transaction(), patient_ref, record_ref, record, patient_update)
+
+
+# One write per record plus the patient merge, under Firestore's 500
+# writes per transaction.
+MAX_VISITS_PER_TRANSACTION = 499
+
+
+@firestore.transactional
+def _save_visits(transaction, patient_ref, records, patient_update):
+    snap = patient_ref.get(transaction=transaction)
+    summary = _stored_summary(transaction, patient_ref, snap)
+
+    for record in records:
+        summary = add_visit(
+            summary,
+            record_probability(record),
+            record_risk_level(record),
+            firestore.SERVER_TIMESTAMP
+        )
+
+    records_ref = patient_ref.collection("records")
+    for record in records:
+        transaction.set(records_ref.document(), record)
+    transaction.set(patient_ref, {**patient_update, "summary": summary}, merge=True)
+
+
+def save_visits(db, patient_ref, records, patient_update):
+    """
+    Writes several new records of one patient and folds them into
+    patient.summary in one transaction (batch scoring): either all of
+    them are saved or none.
+    """
+    if len(records) > MAX_VISITS_PER_TRANSACTION:
+        raise ValueError(f"At most {MAX_VISITS_PER_TRANSACTION} visits per patient")
+
+    _save_visits(db.transaction(), patient_ref, records, patient_update)
+
+
+def _neighbour(transaction, records_ref, direction, exclude_id):
+    query = (
+        records_ref
+        .select(SUMMARY_RECORD_FIELDS)
+        .order_by("created_at", direction=direction)
+        .limit(2)
+    )
+    for snap in transaction.get(query):
+        if snap.id != exclude_id:
+            return snap.to_dict() or {}
+    return None
+
+
+@firestore.transactional
+def _delete_visit(transaction, patient_ref, record_ref):
+    record_snap = record_ref.get(transaction=transaction)
+    if not record_snap.exists:
+        return False
+
+    patient_snap = patient_ref.get(transaction=transaction)
+    summary = {**empty_summary(), **_stored_summary(transaction, patient_ref, patient_snap)}
+
+    records_ref = patient_ref.collection("records")
+    oldest = _neighbour(transaction, records_ref, firestore.Query.ASCENDING, record_ref.id)
+    newest = _neighbour(transaction, records_ref, firestore.Query.DESCENDING, record_ref.id)
+
+    removed = record_snap.to_dict() or {}
+    prob = record_probability(removed)
+
+    summary["records_count"] = max(0, summary["records_count"] - 1)
+    if prob is not None and summary["scored_count"]:
+        summary["scored_count"] -= 1
+        summary["sum_probability"] = max(0.0, summary["sum_probability"] - prob)
+        summary["sum_sq_probability"] = max(0.0, summary["sum_sq_probability"] - prob ** 2)
+
+    if newest is None:
+        summary = {**empty_summary(), "cardiac_arrest": summary.get("cardiac_arrest", 0)}
+    else:
+        summary["first_probability"] = record_probability(oldest)
+        summary["first_visit_at"] = oldest.get("created_at")
+        summary["latest_probability"] = record_probability(newest)
+        summary["latest_risk_level"] = record_risk_level(newest)
+        summary["last_visit_at"] = newest.get("created_at")
+
+    transaction.delete(record_ref)
+    transaction.set(patient_ref, {"summary": summary}, merge=True)
+    return True
+
+
+def delete_visit(db, patient_ref, record_ref):
+    """
+    Deletes a record and corrects patient.summary in one transaction.
+
+    Returns False when the record does not exist.
+    """
+    return _delete_visit(db.transaction(), patient_ref, record_ref)
+
+
+@firestore.transactional
+def _mark_cardiac_arrest(transaction, patient_ref):
+    snap = patient_ref.get(transaction=transaction)
+    if not snap.exists:
+        return "missing"
+
+    if ((snap.to_dict() or {}).get("outcome") or {}).get("cardiac_arrest") == 1:
+        return "locked"
+
+    transaction.update(patient_ref, {
+        "outcome": {
+            "cardiac_arrest": 1,
+            "marked_at": firestore.SERVER_TIMESTAMP
+        },
+        "summary.cardiac_arrest": 1
+    })
+    return "ok"
+
+
+def mark_cardiac_arrest(db, patient_ref):
+    """
+    Locks the patient's cardiac arrest outcome and flags patient.summary
+    in one transaction. Returns "ok", "locked" (already marked) or
+    "missing".
+    """
+    return _mark_cardiac_arrest(db.transaction(), patient_ref)
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# Only what utils/pdf_generator.generate_patient_report (and the email
+# recipients) read - select() projections for the three report reads.
+REPORT_HOSPITAL_FIELDS = ["name", "address"]
+
+REPORT_PATIENT_FIELDS = [
+    "name",
+    "age",
+    "gender",
+    "patient_email",
+    "guardian_email",
+    "trend",
+]
+
+REPORT_RECORD_FIELDS = [
+    "created_at",
+    "prediction.risk_level",
+    "prediction.probability",
+    "input.ap_hi",
+    "input.ap_lo",
+    "input.weight",
+    "input.smoke",
+    "input.alco",
+    "input.active",
+    "input.chest_pain",
+    "input.nausea",
+    "input.palpitations",
+    "input.dizziness",
+    "derived.bmi",
+    "derived.ecg_risk_delta",
+    "doctor_notes.text",
+    "ecg",
+    "ecg_flags",
+]
+
+# hospital, patient and records are fetched side by side
+report_reader = ThreadPoolExecutor(max_workers=6, thread_name_prefix="report-reads")
+
+
+def report_record(d):
+    doctor_notes = d.get("doctor_notes")
+
+    return {
+        "created_at": d.get("created_at"),
+        "prediction": d.get("prediction", {}),
+        "input": d.get("input", {}),
+        "derived": d.get("derived", {}),
+        "doctor_note": (
+            doctor_notes.get("text")
+            if isinstance(doctor_notes, dict)
+            else None
+        ),
+        "ecg": d.get("ecg"),
+        "ecg_flags": d.get("ecg_flags"),
+    }
+
+
+def load_report_data(db, hospital_id, patient_id):
+    """
+    (hospital, patient, records) for a patient report, read concurrently.
+
+    patient is None when the patient does not exist.
+    """
+    hospital_ref = db.collection("hospitals").document(hospital_id)
+    patient_ref = hospital_ref.collection("patients").document(patient_id)
+
+    hospital_future = report_reader.submit(
+        hospital_ref.get, field_paths=REPORT_HOSPITAL_FIELDS
+    )
+    patient_future = report_reader.submit(
+        patient_ref.get, field_paths=REPORT_PATIENT_FIELDS
+    )
+    records_future = report_reader.submit(
+        lambda: list(
+            patient_ref.collection("records")
+            .select(REPORT_RECORD_FIELDS)
+            .order_by("created_at")
+            .stream()
+        )
+    )
+
+    hospital = hospital_future.result().to_dict() or {}
+    patient_snap = patient_future.result()
+    records = [report_record(r.to_dict() or {}) for r in records_future.result()]
+
+    if not patient_snap.exists:
+        return hospital, None, []
+
+    patient = patient_snap.to_dict() or {}
+    patient["patient_id"] = patient_id
+
+    return hospital, patient, records
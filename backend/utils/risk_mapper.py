@@ -1,11 +1,16 @@
+# Probability cut-offs between risk levels
+LOW_RISK_BELOW = 0.30
+MEDIUM_RISK_BELOW = 0.60
+
+
 def map_risk(probability: float):
     """
     Convert probability to human-readable risk level.
     """
 
-    if probability < 0.30:
+    if probability < LOW_RISK_BELOW:
         return "Low"
-    elif probability < 0.60:
+    elif probability < MEDIUM_RISK_BELOW:
         return "Medium"
     else:
         return "High"
\ No newline at end of file
@@ -0,0 +1,129 @@
+import itertools
+
+import numpy as np
+
+from ml.features import FEATURE_INDEX, NUMERIC_FIELDS, encode_one
+
+# Input field -> (min, max) a sweep may cover (same bounds as validate_input)
+SENSITIVITY_RANGES = {
+    "age": (1, 120),
+    "height": (100, 250),
+    "weight": (20, 300),
+    "ap_hi": (50, 250),
+    "ap_lo": (30, 150),
+    "cholesterol": (1, 3),
+    "gluc": (1, 3),
+    "smoke": (0, 1),
+    "alco": (0, 1),
+    "active": (0, 1),
+}
+
+MAX_SENSITIVITY_VARIABLES = 3
+MAX_GRID_POINTS = 5000
+
+
+def sweep_values(variable: dict):
+    """
+    One variable spec -> (field, float64 values).
+
+    {"field": "ap_hi", "start": 100, "stop": 200, "step": 5}  (stop inclusive)
+    {"field": "smoke", "values": [0, 1]}
+    """
+    field = variable.get("field")
+    if field not in SENSITIVITY_RANGES:
+        raise ValueError(f"Unsupported sensitivity field: {field}")
+
+    if "values" in variable:
+        values = np.array([float(v) for v in variable["values"]], dtype=np.float64)
+    else:
+        start = float(variable["start"])
+        stop = float(variable["stop"])
+        step = float(variable.get("step", 1))
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid range for {field}")
+        if (stop - start) / step + 1 > MAX_GRID_POINTS:
+            raise ValueError(f"Too many points for {field}")
+        values = np.arange(start, stop + step / 2, step, dtype=np.float64)
+
+    low, high = SENSITIVITY_RANGES[field]
+    if values.size == 0 or values.min() < low or values.max() > high:
+        raise ValueError(f"{field} values must be between {low} and {high}")
+
+    return field, values
+
+
+def build_sensitivity_grid(input_data: dict, variables: list):
+    """
+    Every combination of the swept values applied to one patient.
+
+    The base row is encoded once and tiled; swept columns are written
+    from a meshgrid and BMI is recomputed when height or weight moves.
+
+    Returns:
+        list[str]: swept fields
+        list[np.ndarray]: values per field
+        np.ndarray: float32 grid, shape (prod(len(values)), n_features)
+    """
+    if not variables or len(variables) > MAX_SENSITIVITY_VARIABLES:
+        raise ValueError(f"Provide 1 to {MAX_SENSITIVITY_VARIABLES} variables")
+
+    fields, axes = zip(*(sweep_values(v) for v in variables))
+    if len(set(fields)) != len(fields):
+        raise ValueError("Each field can only be swept once")
+
+    n_points = int(np.prod([len(a) for a in axes]))
+    if n_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid too large ({n_points} points, max {MAX_GRID_POINTS})")
+
+    base, _ = encode_one(input_data)
+    X = np.tile(base, (n_points, 1))
+
+    mesh = np.meshgrid(*axes, indexing="ij")
+    for field, column in zip(fields, mesh):
+        X[:, FEATURE_INDEX[NUMERIC_FIELDS[field]]] = column.ravel()
+
+    if "height" in fields or "weight" in fields:
+        height_m = X[:, FEATURE_INDEX["height"]].astype(np.float64) / 100
+        weight = X[:, FEATURE_INDEX["weight"]].astype(np.float64)
+        X[:, FEATURE_INDEX["bmi"]] = weight / (height_m ** 2)
+
+    return list(fields), list(axes), X
+
+
+def sensitivity_analysis(model, scaler, input_data: dict, variables: list):
+    """
+    Risk curves over the swept grid, scored in one
+    scaler.transform + predict_proba call.
+
+    The first variable is the x axis; every combination of the others
+    becomes one series, e.g. ap_hi 100-200 x smoke {0, 1} -> 2 curves.
+    """
+    fields, axes, X = build_sensitivity_grid(input_data, variables)
+    base, _ = encode_one(input_data)
+
+    # Patient's own row rides along as the last row of the same call
+    probs = model.predict_proba(scaler.transform(np.vstack([X, base])))[:, 1]
+    baseline = probs[-1]
+    probs = probs[:-1].reshape([len(a) for a in axes])
+
+    series = []
+    for combo in itertools.product(*(range(len(a)) for a in axes[1:])):
+        fixed = {
+            field: float(values[i])
+            for field, values, i in zip(fields[1:], axes[1:], combo)
+        }
+        series.append({
+            "label": ", ".join(f"{k}={v:g}" for k, v in fixed.items()) or fields[0],
+            "fixed": fixed,
+            "probability": [round(float(p), 3) for p in probs[(slice(None),) + combo]]
+        })
+
+    return {
+        "x": {
+            "field": fields[0],
+            "values": [float(v) for v in axes[0]]
+        },
+        "series": series,
+        "baseline_probability": round(float(baseline), 3),
+        "points": int(probs.size)
+    }
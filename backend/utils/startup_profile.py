@@ -0,0 +1,51 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# Wall clock from the first import of this module (≈ process boot)
+_BOOT = time.perf_counter()
+_steps = []
+
+# Top-level packages worth calling out in the report
+HEAVY_MODULES = {
+    "reportlab", "pandas", "sklearn", "scipy", "joblib",
+    "smtplib", "google", "grpc", "firebase_admin", "numpy",
+}
+
+
+@contextmanager
+def step(name):
+    """
+    Time one init step; also records which modules it pulled in.
+    """
+    modules_before = set(sys.modules)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        new_modules = set(sys.modules) - modules_before
+        _steps.append({
+            "step": name,
+            "ms": round(elapsed * 1000, 1),
+            "new_modules": len(new_modules),
+            "heavy_modules": sorted(
+                m for m in new_modules
+                if "." not in m and m in HEAVY_MODULES
+            ),
+        })
+
+
+def report():
+    return {
+        "total_ms": round((time.perf_counter() - _BOOT) * 1000, 1),
+        "steps": list(_steps),
+    }
+
+
+def log_report(logger):
+    data = report()
+    logger.info("STARTUP: %s ms", data["total_ms"])
+    for s in sorted(data["steps"], key=lambda s: s["ms"], reverse=True):
+        heavy = f"  [{', '.join(s['heavy_modules'])}]" if s["heavy_modules"] else ""
+        logger.info("  %8.1f ms  %s (+%s modules)%s", s["ms"], s["step"], s["new_modules"], heavy)
@@ -1,54 +1,105 @@
-import copy
-from ml.preprocess import preprocess_input
+import numpy as np
+
+from ml.features import encode_records
+from ml.preprocess import load_scaler
 from config import SCALER_PATH
 
 
-def what_if_analysis(model, input_data: dict):
-    scenarios = []
+def _stop_smoking(data):
+    return {**data, "smoke": 0}
 
-    # 🔹 Base probability (IMPORTANT)
-    X_base, _ = preprocess_input(input_data, SCALER_PATH)
-    base_prob = model.predict_proba(X_base)[0][1]
 
-    def safe_prob(modified_input):
-        X, _ = preprocess_input(modified_input, SCALER_PATH)
-        prob = model.predict_proba(X)[0][1]
+def _control_bp(data):
+    return {**data, "ap_hi": 130, "ap_lo": 85}
 
-        # 🛡️ CLINICAL SAFETY CLAMP
-        if prob > base_prob:
-            prob = base_prob
 
-        return round(float(prob), 3)
+def _resolve_chest_pain(data):
+    return {**data, "chest_pain": "none"}
 
-    # 1️⃣ Stop smoking
-    if int(input_data.get("smoke", 0)) == 1:
-        modified = copy.deepcopy(input_data)
-        modified["smoke"] = 0
 
-        scenarios.append({
-            "change": "If smoking is stopped",
-            "new_probability": safe_prob(modified)
-        })
+# (label, applies to this patient?, counterfactual input)
+# New scenarios only need a row here; they are scored in the same pass.
+WHAT_IF_SCENARIOS = [
+    (
+        "If smoking is stopped",
+        lambda d: int(d.get("smoke", 0)) == 1,
+        _stop_smoking,
+    ),
+    (
+        "If blood pressure is controlled",
+        lambda d: int(d.get("ap_hi", 0)) > 130,
+        _control_bp,
+    ),
+    (
+        "If chest pain symptoms reduce",
+        lambda d: d.get("chest_pain") in ("moderate", "severe"),
+        _resolve_chest_pain,
+    ),
+]
 
-    # 2️⃣ Control blood pressure
-    if int(input_data.get("ap_hi", 0)) > 130:
-        modified = copy.deepcopy(input_data)
-        modified["ap_hi"] = 130
-        modified["ap_lo"] = 85
 
-        scenarios.append({
-            "change": "If blood pressure is controlled",
-            "new_probability": safe_prob(modified)
-        })
+def what_if_batch(model, inputs, base_probabilities, scaler):
+    """
+    what_if_analysis for many visits: every applicable scenario of every
+    visit is scored in one scaler.transform + predict_proba call, and
+    clamped against that visit's own base probability.
+    """
+    results = [[] for _ in inputs]
+    owners, labels, rows = [], [], []
+
+    for i, input_data in enumerate(inputs):
+        for label, applies, modify in WHAT_IF_SCENARIOS:
+            if applies(input_data):
+                owners.append(i)
+                labels.append(label)
+                rows.append(modify(input_data))
 
-    # 3️⃣ Chest pain resolved
-    if input_data.get("chest_pain") in ("moderate", "severe"):
-        modified = copy.deepcopy(input_data)
-        modified["chest_pain"] = "none"
+    if not rows:
+        return results
 
-        scenarios.append({
-            "change": "If chest pain symptoms reduce",
-            "new_probability": safe_prob(modified)
+    X_raw, _ = encode_records(rows)
+    probs = model.predict_proba(scaler.transform(X_raw))[:, 1]
+
+    for i, label, prob in zip(owners, labels, probs):
+        results[i].append({
+            "change": label,
+            "new_probability": round(float(min(prob, base_probabilities[i])), 3)
         })
 
-    return scenarios
\ No newline at end of file
+    return results
+
+
+def what_if_analysis(model, input_data: dict, scaler=None):
+    """
+    Scores the base case and every applicable scenario in one
+    scaler.transform + predict_proba call.
+    """
+    if scaler is None:
+        scaler = load_scaler(SCALER_PATH)
+
+    labels = []
+    rows = [input_data]
+
+    for label, applies, modify in WHAT_IF_SCENARIOS:
+        if applies(input_data):
+            labels.append(label)
+            rows.append(modify(input_data))
+
+    if not labels:
+        return []
+
+    X_raw, _ = encode_records(rows)
+    X = scaler.transform(X_raw)
+    probs = model.predict_proba(X)[:, 1]
+
+    # 🛡️ CLINICAL SAFETY CLAMP (never show a scenario as riskier than today)
+    base_prob = probs[0]
+    scenario_probs = np.minimum(probs[1:], base_prob)
+
+    return [
+        {
+            "change": label,
+            "new_probability": round(float(prob), 3)
+        }
+        for label, prob in zip(labels, scenario_probs)
+    ]
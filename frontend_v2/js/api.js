@@ -34,9 +34,18 @@ export function fetchHospitalProfile() {
   return apiFetch("/auth/me");
 }
 
-//Fetch Patients
-export function fetchPatients() {
-  return apiFetch("/patients");
+//Fetch Patients (one page; params: limit, cursor, deleted, gender,
+//created_from, created_to, name)
+export function fetchPatients(params = {}) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== null && value !== undefined && value !== "") {
+      query.set(key, value);
+    }
+  });
+
+  const qs = query.toString();
+  return apiFetch(qs ? `/patients?${qs}` : "/patients");
 }
 
 //Search patient
@@ -5,7 +5,7 @@ import {
   logout
 } from "./api.js";
 
-let masterPatients = [];   // always clean (non-deleted)
+let masterPatients = [];   // pages loaded so far for the active filter
 let allPatients = [];      // filtered / visible
 let activeFilter = null; // total | today | week | deleted
 let patientsChart = null;
@@ -13,6 +13,7 @@ let pendingDeletePatientId = null;
 let chartRange = "week"; // "week" | "month"
 let fullDailyCounts = [];
 let searchResults = null;
+let nextCursor = null;     // next page of the patient list
 
 
 firebase.auth().onAuthStateChanged(async (user) => {
@@ -38,17 +39,43 @@ firebase.auth().onAuthStateChanged(async (user) => {
 });
 
 
-async function loadRecentPatients() {
+// Server-side filter for the active analytics card
+function patientListParams() {
+  if (activeFilter === "deleted") {
+    return { deleted: "true" };
+  }
+
+  if (activeFilter === "today") {
+    return {
+      deleted: "false",
+      created_from: new Date().toISOString().slice(0, 10)
+    };
+  }
+
+  if (activeFilter === "week") {
+    const last7 = new Date();
+    last7.setDate(last7.getDate() - 7);
+    return { deleted: "false", created_from: last7.toISOString() };
+  }
+
+  return { deleted: "false" };
+}
+
+async function loadRecentPatients(loadMore = false) {
   const listEl = document.getElementById("patientsList");
-  listEl.innerHTML = "<li>Loading patients...</li>";
+  if (!loadMore) {
+    listEl.innerHTML = "<li>Loading patients...</li>";
+  }
 
-  const res = await fetchPatients();
+  const res = await fetchPatients({
+    ...patientListParams(),
+    cursor: loadMore ? nextCursor : null
+  });
 
-  // RAW DATA — may include deleted
-  masterPatients = res.patients || [];
+  const page = res.patients || [];
+  masterPatients = loadMore ? masterPatients.concat(page) : page;
+  nextCursor = res.has_more ? res.next_cursor : null;
 
-  // DEFAULT VIEW = NON-DELETED ONLY
-  activeFilter = null;
   allPatients = masterPatients.filter(p => !p.is_deleted);
 
   applyActiveFilter();
@@ -88,6 +115,22 @@ function applyActiveFilter() {
   }
 
   filtered.forEach(renderPatientCard);
+
+  if (nextCursor && !searchResults) {
+    const more = document.createElement("li");
+    more.className = "load-more";
+    more.innerText = "Load more";
+    more.addEventListener("click", async () => {
+      more.innerText = "Loading...";
+      try {
+        await loadRecentPatients(true);
+      } catch (err) {
+        console.error("Failed to load more patients", err);
+        more.innerText = "Load more";
+      }
+    });
+    listEl.appendChild(more);
+  }
 }
 
 
@@ -263,7 +306,14 @@ if (analyticsEl) {
     }
 
     renderPatientsChart(getChartData());
-    applyActiveFilter();
+
+    if (searchResults) {
+      applyActiveFilter();
+    } else {
+      loadRecentPatients().catch(err =>
+        console.error("Failed to load patients", err)
+      );
+    }
   });
 }  
 
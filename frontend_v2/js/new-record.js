@@ -58,10 +58,15 @@ function setupFormSubmit() {
           patient_id: patientId,
           ...payload,
           save: false,
+          defer_explanations: true,
         }),
       });
 
       showPrediction(result);
+
+      if (result.explanation_status === "pending") {
+        loadExplanations(result);
+      }
     } catch (err) {
       console.error(err);
       alert("❌ Prediction failed");
@@ -69,6 +74,33 @@ function setupFormSubmit() {
   };
 }
 
+// Risk is shown first; the background worker fills in the preview
+// (what-if, symptoms, factors) and we poll for it instead of rescoring.
+const EXPLANATION_POLL_MS = [250, 500, 750, 1000, 1500, 2000, 3000];
+
+async function loadExplanations(result) {
+  const endpoint = result.preview_id
+    ? `/predict/preview/${result.preview_id}/explanations`
+    : `/patients/${patientId}/records/${result.record_id}/explanations`;
+
+  for (const delay of EXPLANATION_POLL_MS) {
+    await new Promise((resolve) => setTimeout(resolve, delay));
+
+    try {
+      const explained = await apiFetch(endpoint);
+      if (explained.explanation_status !== "pending") {
+        // Form was reopened (re-predict) while we were waiting
+        if (document.getElementById("predictionBox").style.display === "none") return;
+        showPrediction({ ...result, ...explained });
+        return;
+      }
+    } catch (err) {
+      console.error(err);
+      return;
+    }
+  }
+}
+
 function buildPayload(form) {
   const fd = new FormData(form);
   const cb = (n) => (fd.get(n) ? 1 : 0);
@@ -156,6 +188,7 @@ function showPrediction(r) {
       body: JSON.stringify({
         patient_id: patientId,
         save: true,
+        defer_explanations: true,
         ...buildPayload(document.getElementById("recordForm")),
       }),
     });
@@ -66,7 +66,10 @@ async function loadTrends() {
   const patientId = new URLSearchParams(window.location.search).get("patient_id");
   if (!patientId) return alert("Patient ID missing");
 
-  const data = await apiFetch(`/patients/${patientId}/timeline`);
+  // Charts only need risk, vitals, ECG impact and notes
+  const data = await apiFetch(
+    `/patients/${patientId}/timeline?fields=risk,vitals,ecg_risk_delta,doctor_notes`
+  );
   const timeline = data.timeline || [];
 
   if (timeline.length < 2) {